@@ -0,0 +1,249 @@
+"""Static CSS and HTML fragments of the app, built once per process.
+
+Streamlit re-executes streamlit_app.py on every rerun but keeps imported
+modules, so everything here is minified and formatted once when the app
+process first imports it. A rerun then sends the finished stylesheet and
+fills the few values of each fragment with str.format.
+"""
+import re
+
+# Custom CSS for modern styling with updated font color for white boxes and pop-ups
+STYLESHEET_SOURCE = """
+    .main {
+        padding: 1rem;
+    }
+    
+    .game-header {
+        text-align: center;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 2rem;
+        border-radius: 15px;
+        margin-bottom: 2rem;
+        color: white;
+    }
+    
+    .score-card {
+        background: #f8f9fa;
+        border-radius: 10px;
+        padding: 1.5rem;
+        text-align: center;
+        border-left: 4px solid #007bff;
+        margin-bottom: 1rem;
+        color: #000000; /* Set font color to black */
+    }
+    
+    .ai-score-card {
+        background: #f8f9fa;
+        border-radius: 10px;
+        padding: 1.5rem;
+        text-align: center;
+        border-left: 4px solid #dc3545;
+        margin-bottom: 1rem;
+        color: #000000; /* Set font color to black */
+    }
+    
+    .crossword-grid {
+        background: white;
+        border-radius: 10px;
+        padding: 2rem;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        margin: 1rem 0;
+        color: #000000; /* Set font color to black */
+    }
+    
+    .cw-grid {
+        display: grid;
+        gap: 2px;
+        justify-content: center;
+    }
+    
+    .cw-cell, .cw-block {
+        position: relative;
+        width: 1.6rem;
+        height: 1.6rem;
+        line-height: 1.6rem;
+        text-align: center;
+        font-weight: bold;
+        border-radius: 3px;
+    }
+    
+    .cw-cell {
+        background: #f8f9fa;
+        border: 1px solid #ced4da;
+    }
+    
+    .cw-block {
+        background: #343a40;
+    }
+    
+    .cw-num {
+        position: absolute;
+        top: 0;
+        left: 2px;
+        font-size: 0.5rem;
+        line-height: 0.7rem;
+        font-weight: normal;
+    }
+    
+    .cw-active { background: #fff3cd; border-color: #ffc107; }
+    .cw-player { background: #d4edda; }
+    .cw-ai { background: #f8d7da; }
+    .cw-both { background: #d1ecf1; }
+    
+    .clue-card {
+        background: #ffffff;
+        border: 1px solid #e9ecef;
+        border-radius: 8px;
+        padding: 1rem;
+        margin-bottom: 0.5rem;
+        transition: all 0.3s ease;
+        color: #000000; /* Set font color to black */
+    }
+    
+    .clue-card:hover {
+        background: #f8f9fa;
+        border-color: #007bff;
+        color: #000000; /* Ensure hover state text is black */
+    }
+    
+    .clue-card strong, .clue-card small {
+        color: #000000; /* Ensure nested elements have black text */
+    }
+    
+    .feedback-correct {
+        background: #d4edda;
+        color: #155724;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #28a745;
+        margin: 1rem 0;
+    }
+    
+    .feedback-incorrect {
+        background: #f8d7da;
+        color: #721c24;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #dc3545;
+        margin: 1rem 0;
+    }
+    
+    .winner-banner {
+        background: linear-gradient(135deg, #28a745 0%, #20c997 100%);
+        color: white;
+        padding: 2rem;
+        border-radius: 15px;
+        text-align: center;
+        margin: 2rem 0;
+        animation: celebrate 2s infinite;
+        position: fixed;
+        top: 50%;
+        left: 50%;
+        transform: translate(-50%, -50%);
+        z-index: 1000;
+    }
+    
+    .loser-banner {
+        background: linear-gradient(135deg, #dc3545 0%, #c82333 100%);
+        color: white;
+        padding: 2rem;
+        border-radius: 15px;
+        text-align: center;
+        margin: 2rem 0;
+        animation: sad 2s infinite;
+        position: fixed;
+        top: 50%;
+        left: 50%;
+        transform: translate(-50%, -50%);
+        z-index: 1000;
+    }
+    
+    .draw-banner {
+        background: linear-gradient(135deg, #6c757d 0%, #495057 100%);
+        color: white;
+        padding: 2rem;
+        border-radius: 15px;
+        text-align: center;
+        margin: 2rem 0;
+        animation: fade 2s infinite;
+        position: fixed;
+        top: 50%;
+        left: 50%;
+        transform: translate(-50%, -50%);
+        z-index: 1000;
+    }
+    
+    @keyframes celebrate {
+        0% { transform: translate(-50%, -50%) scale(1); }
+        50% { transform: translate(-50%, -50%) scale(1.1); }
+        100% { transform: translate(-50%, -50%) scale(1); }
+    }
+    
+    @keyframes sad {
+        0% { transform: translate(-50%, -50%) scale(1); }
+        50% { transform: translate(-50%, -50%) scale(0.9); }
+        100% { transform: translate(-50%, -50%) scale(1); }
+    }
+    
+    @keyframes fade {
+        0% { opacity: 1; }
+        50% { opacity: 0.7; }
+        100% { opacity: 1; }
+    }
+    
+    .stButton > button {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 0.5rem 2rem;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }
+    
+    .stButton > button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+    }
+"""
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and collapse whitespace; the CSS here has no strings that care"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    return re.sub(r'\s*([{}:;,>])\s*', r'\1', source).replace(';}', '}').strip()
+
+
+STYLE = f'<style>{minify_css(STYLESHEET_SOURCE)}</style>'
+
+HEADER = (
+    '<div class="game-header"><h1>🧩 Crossword Battle Game</h1>'
+    '<p>Compete against AI to score the most points in 5 simultaneous attempts!</p></div>'
+)
+
+# Result banners of a single-player game, by GameState.winner
+BANNERS = {
+    'Player': '<div class="winner-banner"><h2>🎈 YOU WON! 🎈</h2>'
+              '<p>You scored more points than AI in 5 attempts!</p></div>',
+    'AI': '<div class="loser-banner"><h2>😢 YOU LOSE! 😢</h2>'
+          '<p>AI scored more points than you in 5 attempts!</p></div>',
+    'Draw': '<div class="draw-banner"><h2>🤝 DRAW! 🤝</h2>'
+            '<p>The score is equal after 5 attempts!</p></div>',
+}
+
+# Room result banner: CSS class, then an already escaped title
+BANNER = '<div class="{}"><h2>{}</h2></div>'
+
+PLAYER_SCORE = '<div class="score-card"><h3>👤 Your Score</h3><h2>{}</h2></div>'
+AI_SCORE = '<div class="ai-score-card"><h3>🤖 AI Score</h3><h2>{}</h2></div>'
+ATTEMPTS_LEFT = '<div class="score-card"><h3>Attempts Left</h3><h2>{}</h2></div>'
+
+# By GameState.feedback_type
+FEEDBACK = {
+    'correct': '<div class="feedback-correct"><strong>{}</strong></div>',
+    'mixed': '<div class="feedback-correct"><strong>{}</strong></div>',
+    'incorrect': '<div class="feedback-incorrect"><strong>{}</strong></div>',
+}
+
+CLUE_CARD = '<div class="clue-card"><strong>{}. {}</strong><br><small>{}</small></div>'
@@ -0,0 +1,416 @@
+"""Append-only binary log of game starts, attempts and results.
+
+game_stats keeps one row per finished game; this log keeps every attempt
+so a game can be replayed (replay.py) and per-clue or per-difficulty
+aggregates rebuilt from scratch.
+
+Each app process appends to its own file under CROSSWORD_ATTEMPT_LOG_DIR
+through a buffered writer, flushed whenever a game ends, and starts a new
+file once the current one reaches MAX_BYTES. Starting a file also deletes
+files older than RETENTION_DAYS and the oldest beyond MAX_FILES, counted
+across every process writing to the directory; the newest file of each
+process still running is never deleted, as it may still be written. A file is MAGIC followed by
+fixed-width 48-byte records (RECORD_FIELDS):
+
+    kind     u8    START, ATTEMPT, END or MORE
+    code     u8    START: difficulty, ATTEMPT: AI result | PLAYER_CORRECT,
+                   END: winner
+    clue     u16   ATTEMPT: clue id
+    length   u8    bytes of payload used
+    game     u64   random key shared by a game's records
+    time     f64   Unix time
+    payload  24 B  START: puzzle id (UTF-8), ATTEMPT: the player's answer
+                   (UTF-8), END: player score and AI score (i32 each)
+
+A payload longer than 24 bytes continues in MORE records written right
+after it. Readers memory-map a file as a numpy record array, so a scan for
+one game or a rebuild of the totals runs as array operations rather than a
+Python loop per event. A record cut short by a crash is ignored. Only the
+readers need numpy, so it is imported on first read rather than by the app.
+
+Set CROSSWORD_ATTEMPT_LOG=0 to stop logging.
+"""
+import atexit
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ATTEMPT_LOG_ENABLED = os.environ.get('CROSSWORD_ATTEMPT_LOG', '1') == '1'
+LOG_DIR = os.environ.get('CROSSWORD_ATTEMPT_LOG_DIR', 'attempt_log')
+MAX_BYTES = int(os.environ.get('CROSSWORD_ATTEMPT_LOG_MAX_BYTES', str(64 * 1024 * 1024)))
+MAX_FILES = int(os.environ.get('CROSSWORD_ATTEMPT_LOG_MAX_FILES', '64'))
+RETENTION_DAYS = float(os.environ.get('CROSSWORD_ATTEMPT_LOG_RETENTION_DAYS', '30'))
+BUFFER_SIZE = 64 * 1024
+MAX_ANSWER_BYTES = 240
+
+MAGIC = b'CWLOG\x00\x01\x00'
+PAYLOAD_SIZE = 24
+RECORD_FIELDS = [
+    ('kind', 'u1'), ('code', 'u1'), ('clue', '<u2'), ('length', 'u1'), ('pad', 'V3'),
+    ('game', '<u8'), ('time', '<f8'), ('payload', f'S{PAYLOAD_SIZE}'),
+]
+PACK_RECORD = struct.Struct(f'<BBHB3xQd{PAYLOAD_SIZE}s')
+SCORES = struct.Struct('<ii')
+
+START, ATTEMPT, END, MORE = 1, 2, 3, 4
+DIFFICULTIES = ('easy', 'medium', 'hard')
+WINNERS = ('Draw', 'Player', 'AI')
+
+# ATTEMPT codes: the AI's result in the low two bits, plus PLAYER_CORRECT
+AI_WRONG, AI_CORRECT, AI_TIMEOUT, AI_SKIPPED = 0, 1, 2, 3
+AI_RESULT_MASK = 0b11
+PLAYER_CORRECT = 0b100
+
+_keys = random.Random()
+
+
+def new_game_key() -> int:
+    return _keys.getrandbits(64) or 1
+
+
+def pack(kind: int, code: int, game_key: int, payload: bytes = b'', clue_id: int = 0,
+         timestamp: Optional[float] = None) -> bytes:
+    """One record, followed by MORE records if the payload does not fit"""
+    timestamp = time.time() if timestamp is None else timestamp
+    head = payload[:PAYLOAD_SIZE]
+    record = PACK_RECORD.pack(kind, code, clue_id, len(head), game_key, timestamp, head)
+    if len(payload) <= PAYLOAD_SIZE:
+        return record
+    parts = [record]
+    for offset in range(PAYLOAD_SIZE, len(payload), PAYLOAD_SIZE):
+        part = payload[offset:offset + PAYLOAD_SIZE]
+        parts.append(PACK_RECORD.pack(MORE, 0, 0, len(part), game_key, timestamp, part))
+    return b''.join(parts)
+
+
+class AttemptLog:
+    """Buffered, size-rotated writer for one process"""
+
+    def __init__(self, directory: str = LOG_DIR, max_bytes: int = MAX_BYTES,
+                 buffer_size: int = BUFFER_SIZE, max_files: int = MAX_FILES,
+                 retention_days: float = RETENTION_DAYS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.max_files = max_files
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._handle = None
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, game_key: int, difficulty: str, puzzle_id: Union[int, str]):
+        self._write(pack(START, DIFFICULTIES.index(difficulty), game_key, str(puzzle_id).encode()))
+
+    def attempt(self, game_key: int, clue_id: int, answer: str, player_correct: bool, ai_result: int):
+        code = ai_result | (PLAYER_CORRECT if player_correct else 0)
+        self._write(pack(ATTEMPT, code, game_key, answer.encode()[:MAX_ANSWER_BYTES], clue_id))
+
+    def end(self, game_key: int, winner: str, player_score: int, ai_score: int):
+        self._write(pack(END, WINNERS.index(winner), game_key, SCORES.pack(player_score, ai_score)),
+                    flush=True)
+
+    def _write(self, records: bytes, flush: bool = False):
+        with self._lock:
+            if self._handle is None or self._size >= self.max_bytes:
+                self._rotate()
+            self._handle.write(records)
+            self._size += len(records)
+            if flush:
+                self._handle.flush()
+
+    def _rotate(self):
+        if self._handle is not None:
+            self._handle.close()
+        self._sequence += 1
+        name = f'attempts-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{self._sequence:04d}.log'
+        path = os.path.join(self.directory, name)
+        self._handle = open(path, 'ab', buffering=self.buffer_size)
+        self._handle.write(MAGIC)
+        self._size = len(MAGIC)
+        self.prune(keep=path)
+
+    def prune(self, keep: Optional[str] = None) -> List[str]:
+        """Delete files past the retention age or file limit, oldest first; returns their paths.
+
+        Only closed files are deleted: `keep` and the newest file of every
+        process still running are left alone.
+        """
+        paths = log_files(self.directory)
+        open_files = set(_open_files(paths))
+        if keep is not None:
+            open_files.add(keep)
+        cutoff = time.time() - self.retention_days * 86400
+        excess = len(paths) - self.max_files
+        removed = []
+        for path in paths:
+            if path in open_files:
+                continue
+            try:
+                if excess <= 0 and os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+                removed.append(path)
+            except FileNotFoundError:
+                pass  # pruned by another process
+            excess -= 1
+        return removed
+
+    def flush(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+_log: Optional[AttemptLog] = None
+_log_lock = threading.Lock()
+
+
+def open_log() -> Optional[AttemptLog]:
+    """Open the process-wide log unless CROSSWORD_ATTEMPT_LOG=0; safe to call on every rerun"""
+    global _log
+    if not ATTEMPT_LOG_ENABLED:
+        return None
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = AttemptLog()
+                atexit.register(_log.close)
+    return _log
+
+
+def get_log() -> Optional[AttemptLog]:
+    return _log
+
+
+class Event(NamedTuple):
+    kind: int
+    code: int
+    game_key: int
+    timestamp: float
+    clue_id: int
+    payload: bytes
+
+    @property
+    def difficulty(self) -> str:
+        return DIFFICULTIES[self.code]
+
+    @property
+    def puzzle_id(self) -> Union[int, str]:
+        text = self.payload.decode()
+        return int(text) if text.isdigit() else text
+
+    @property
+    def answer(self) -> str:
+        return self.payload.decode(errors='replace')
+
+    @property
+    def player_correct(self) -> bool:
+        return bool(self.code & PLAYER_CORRECT)
+
+    @property
+    def ai_result(self) -> int:
+        return self.code & AI_RESULT_MASK
+
+    @property
+    def winner(self) -> str:
+        return WINNERS[self.code]
+
+    @property
+    def scores(self) -> Tuple[int, int]:
+        return SCORES.unpack(self.payload)
+
+
+def log_files(directory: str = LOG_DIR) -> List[str]:
+    """Log files in the order they were started"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory) if name.startswith('attempts-') and name.endswith('.log'))
+    return [os.path.join(directory, name) for name in names]
+
+
+def _writer_pid(path: str) -> Optional[int]:
+    # attempts-<date>-<time>-<pid>-<sequence>.log
+    parts = os.path.basename(path)[:-len('.log')].split('-')
+    return int(parts[3]) if len(parts) == 5 and parts[3].isdigit() else None
+
+
+def _pid_running(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        return True  # os.kill would terminate it; keep the file
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _open_files(paths: List[str]) -> Iterator[str]:
+    """The newest of `paths` (as ordered by log_files) for each writer still running"""
+    newest: Dict[int, str] = {}
+    for path in paths:
+        pid = _writer_pid(path)
+        if pid is not None:
+            newest[pid] = path
+    return (path for pid, path in newest.items() if _pid_running(pid))
+
+
+@lru_cache(maxsize=None)
+def record_dtype() -> 'np.dtype':
+    import numpy as np
+
+    return np.dtype(RECORD_FIELDS)
+
+
+def read_records(path: str) -> 'np.ndarray':
+    """The file's complete records as a read-only array over a memory map"""
+    import numpy as np
+
+    record = record_dtype()
+    with open(path, 'rb') as handle:
+        count = (os.fstat(handle.fileno()).st_size - len(MAGIC)) // record.itemsize
+        if count <= 0:
+            return np.empty(0, dtype=record)
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError(f'{path} is not an attempt log')
+    return np.frombuffer(mapped, dtype=record, count=count, offset=len(MAGIC))
+
+
+def _payload(record) -> bytes:
+    # 'S' fields drop trailing NULs, which a packed score can end with
+    return record['payload'].ljust(record['length'], b'\x00')[:record['length']]
+
+
+def decode(records: 'np.ndarray') -> Iterator[Event]:
+    """Events from consecutive records, joining MORE records onto the one before"""
+    event = None
+    for record in records:
+        if record['kind'] == MORE:
+            if event is not None:
+                event = event._replace(payload=event.payload + _payload(record))
+            continue
+        if event is not None:
+            yield event
+        event = Event(int(record['kind']), int(record['code']), int(record['game']),
+                      float(record['time']), int(record['clue']), _payload(record))
+    if event is not None:
+        yield event
+
+
+def iter_events(paths: Iterable[str], game_key: Optional[int] = None) -> Iterator[Event]:
+    """Decoded events from these files, optionally only one game's"""
+    import numpy as np
+
+    for path in paths:
+        records = read_records(path)
+        if game_key is not None:
+            records = records[records['game'] == np.uint64(game_key)]
+        yield from decode(records)
+
+
+class Aggregates:
+    """Totals rebuilt from a scan of the log"""
+
+    def __init__(self):
+        self.events = 0
+        self.games: Counter = Counter()       # difficulty -> games started
+        self.results: Counter = Counter()     # (difficulty, winner) -> finished games
+        self.attempts: Counter = Counter()    # difficulty -> attempts
+        self.player_solves: Counter = Counter()
+        self.ai_results: Counter = Counter()  # (difficulty, AI result code) -> attempts
+        self.clues: Dict[Tuple[str, int], Tuple[int, int]] = {}  # (puzzle id, clue id) -> (attempts, solves)
+
+    def format(self) -> str:
+        lines = [f'{self.events} events']
+        for difficulty in DIFFICULTIES:
+            if not self.games[difficulty]:
+                continue
+            attempts = self.attempts[difficulty] or 1
+            wins = ', '.join(f'{winner} {self.results[difficulty, winner]}' for winner in WINNERS)
+            lines.append(f'{difficulty}: {self.games[difficulty]} games ({wins}), '
+                         f'player solved {self.player_solves[difficulty] / attempts:.1%}, '
+                         f'AI solved {self.ai_results[difficulty, AI_CORRECT] / attempts:.1%}')
+        return '\n'.join(lines)
+
+
+def rebuild_aggregates(paths: Iterable[str]) -> Aggregates:
+    """Totals over every game whose START is in these files, computed with array operations"""
+    import numpy as np
+
+    totals = Aggregates()
+    starts, attempts, ends = [], [], []
+    for path in paths:
+        records = read_records(path)
+        totals.events += int(np.count_nonzero(records['kind'] != MORE))
+        kind = records['kind']
+        starts.append(records[kind == START][['game', 'code', 'payload']])
+        attempts.append(records[kind == ATTEMPT][['game', 'code', 'clue']])
+        ends.append(records[kind == END][['game', 'code']])
+    if not starts:
+        return totals
+    start = np.concatenate(starts)
+    attempt = np.concatenate(attempts)
+    end = np.concatenate(ends)
+
+    order = np.argsort(start['game'])
+    start_games = start['game'][order]
+    start_codes = start['code'][order].astype(np.intp)
+    puzzles, start_puzzles = np.unique(start['payload'][order], return_inverse=True)
+
+    def owners(games: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Index into the sorted starts of each record's game, and which have one
+        found = np.searchsorted(start_games, games).clip(max=max(len(start_games) - 1, 0))
+        known = start_games[found] == games if len(start_games) else np.zeros(len(games), bool)
+        return found[known], known
+
+    for code, count in enumerate(np.bincount(start_codes, minlength=len(DIFFICULTIES))):
+        totals.games[DIFFICULTIES[code]] = int(count)
+
+    found, known = owners(end['game'])
+    results = np.bincount(start_codes[found] * len(WINNERS) + end['code'][known],
+                          minlength=len(DIFFICULTIES) * len(WINNERS))
+    for index, count in enumerate(results):
+        difficulty, winner = divmod(index, len(WINNERS))
+        totals.results[DIFFICULTIES[difficulty], WINNERS[winner]] = int(count)
+
+    found, known = owners(attempt['game'])
+    difficulty = start_codes[found]
+    codes = attempt['code'][known]
+    solved = (codes & PLAYER_CORRECT) != 0
+    by_difficulty = np.bincount(difficulty, minlength=len(DIFFICULTIES))
+    solves = np.bincount(difficulty, weights=solved, minlength=len(DIFFICULTIES))
+    ai = np.bincount(difficulty * 4 + (codes & AI_RESULT_MASK), minlength=len(DIFFICULTIES) * 4)
+    for code, name in enumerate(DIFFICULTIES):
+        totals.attempts[name] = int(by_difficulty[code])
+        totals.player_solves[name] = int(solves[code])
+        for result in range(4):
+            totals.ai_results[name, result] = int(ai[code * 4 + result])
+
+    clue_keys = start_puzzles[found].astype(np.int64) << 16 | attempt['clue'][known]
+    keys, inverse, counts = np.unique(clue_keys, return_inverse=True, return_counts=True)
+    clue_solves = np.bincount(inverse, weights=solved, minlength=len(keys))
+    for key, count, solved_count in zip(keys.tolist(), counts.tolist(), clue_solves.tolist()):
+        totals.clues[puzzles[key >> 16].decode(), key & 0xFFFF] = (count, int(solved_count))
+    return totals
@@ -0,0 +1,55 @@
+"""Submit latency with an expensive AI, computed inline versus prepared in the background.
+
+The AI's thinking time is simulated with CROSSWORD_AI_THINKING_SCALE; the
+player takes --read-ms to answer each clue.
+
+Usage: python benchmarks/bench_ai_latency.py [--games 20] [--scale 0.01] [--read-ms 100]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_engine
+from game_engine import GameEngine
+
+
+def play(games: int, read_ms: float, prepared: bool, scale: float) -> list:
+    engine = GameEngine(rng=random.Random(1))
+    latencies = []
+    for i in range(games):
+        engine.start(('easy', 'medium', 'hard')[i % 3])
+        while not engine.is_over():
+            clue = engine.current_clue()
+            if prepared:
+                engine.prepare_ai()
+            time.sleep(read_ms / 1000)
+            started = time.perf_counter()
+            if not prepared:
+                # What process_simultaneous_attempt would pay for an expensive AI
+                engine.ai_player.think(clue, scale=scale)
+            engine.submit(clue['id'], clue['answer'])
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--scale', type=float, default=0.01, help='thinking_times multiplier')
+    parser.add_argument('--read-ms', type=float, default=100)
+    args = parser.parse_args()
+
+    game_engine.AI_THINKING_SCALE = args.scale
+    for label, prepared in (('inline', False), ('background', True)):
+        latencies = sorted(play(args.games, args.read_ms, prepared, args.scale))
+        print(f'{label:>10}: median {statistics.median(latencies):7.2f} ms  '
+              f'p99 {latencies[int(len(latencies) * 0.99)]:7.2f} ms  ({len(latencies)} submits)')
+
+
+if __name__ == '__main__':
+    main()
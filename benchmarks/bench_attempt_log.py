@@ -0,0 +1,89 @@
+"""Attempt log write throughput, scan rate and single-game replay latency.
+
+Writes --games synthetic games (a START, five ATTEMPTs and an END each) to
+a temporary log directory, rotating every --max-mb, then times a full scan
+for one game's records, rebuild_aggregates() and replaying one game from
+the middle.
+
+Usage: python benchmarks/bench_attempt_log.py [--games 300000] [--max-mb 16]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from attempt_log import AttemptLog, log_files, new_game_key, read_records, rebuild_aggregates  # noqa: E402
+from crossword import CrosswordData  # noqa: E402
+from replay import replay_game  # noqa: E402
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=300000)
+    parser.add_argument('--max-mb', type=float, default=16)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        log = AttemptLog(directory, max_bytes=int(args.max_mb * 1024 * 1024))
+        rng = random.Random(1)
+        clues = {d: CrosswordData.get_puzzle(d)['clues'][:5] for d in DIFFICULTIES}
+        keys = []
+        start = time.perf_counter()
+        for i in range(args.games):
+            difficulty = DIFFICULTIES[i % 3]
+            key = new_game_key()
+            keys.append(key)
+            log.start(key, difficulty, difficulty)
+            player = ai = 0
+            for clue in clues[difficulty]:
+                correct = rng.random() < 0.6
+                ai_correct = rng.random() < 0.8
+                player += 5 * correct
+                ai += 5 * ai_correct
+                log.attempt(key, clue['id'], clue['answer'] if correct else 'WRONG', correct, int(ai_correct))
+            winner = 'Player' if player > ai else 'AI' if ai > player else 'Draw'
+            log.end(key, winner, player, ai)
+        log.close()
+        write = time.perf_counter() - start
+        paths = log_files(directory)
+        events = args.games * 7
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f'write: {events / write:,.0f} events/s, {size / events:.1f} bytes/event, '
+              f'{len(paths)} files, {size / 2**20:.1f} MiB')
+
+        key = np.uint64(keys[len(keys) // 3])
+        start = time.perf_counter()
+        count = found = 0
+        for path in paths:
+            records = read_records(path)
+            count += len(records)
+            found += int(np.count_nonzero(records['game'] == key))
+        scan = time.perf_counter() - start
+        print(f'scan for one game: {count / scan:,.0f} records/s ({found} records found)')
+
+        start = time.perf_counter()
+        totals = rebuild_aggregates(paths)
+        rebuild = time.perf_counter() - start
+        print(f'rebuild_aggregates: {totals.events / rebuild:,.0f} events/s ({rebuild:.2f}s)')
+
+        start = time.perf_counter()
+        replay = replay_game(keys[len(keys) // 2], paths)
+        state = replay.engine.state
+        print(f'replay one game: {(time.perf_counter() - start) * 1e3:.0f} ms '
+              f'({state.winner} {state.player_score}-{state.ai_score}, {len(replay.mismatches)} mismatches)')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
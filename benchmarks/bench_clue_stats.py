@@ -0,0 +1,89 @@
+"""Per-clue statistics: recording, batched flushes and snapshot lookups.
+
+Records attempts for a pool of puzzles into a temporary database, flushing
+every --batch attempts, then checks that the stored running mean and
+variance match a recomputation from the raw attempts and times cold and
+cached estimate lookups.
+
+Usage: python benchmarks/bench_clue_stats.py [--attempts 200000] [--puzzles 500] [--batch 5000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The database module reads the path on import
+workdir = tempfile.TemporaryDirectory(prefix='crossword-clue-stats-')
+os.environ['CROSSWORD_DB_PATH'] = os.path.join(workdir.name, 'clue_stats.db')
+
+import clue_stats  # noqa: E402
+from database import connection, init_database  # noqa: E402
+
+CLUES_PER_PUZZLE = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attempts', type=int, default=200000)
+    parser.add_argument('--puzzles', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=5000, help='attempts recorded between flushes')
+    args = parser.parse_args()
+
+    init_database()
+    rng = random.Random(1)
+    recorder = clue_stats.ClueStatsRecorder(flush_interval=3600)
+    raw = {}
+    record_time = flush_time = 0.0
+    flushes = 0
+    for i in range(args.attempts):
+        key = (str(rng.randrange(args.puzzles)), rng.randrange(1, CLUES_PER_PUZZLE + 1))
+        solved = rng.random() < 0.3 + 0.1 * key[1]
+        seconds = rng.expovariate(1 / (5 + 3 * key[1]))
+        raw.setdefault(key, []).append((solved, seconds))
+        start = time.perf_counter()
+        recorder.record(key[0], key[1], solved, seconds)
+        record_time += time.perf_counter() - start
+        if (i + 1) % args.batch == 0:
+            start = time.perf_counter()
+            recorder.flush()
+            flush_time += time.perf_counter() - start
+            flushes += 1
+    recorder.close()
+
+    print(f'record: {record_time / args.attempts * 1e6:.2f} µs/attempt')
+    print(f'flush:  {flush_time / max(flushes, 1) * 1e3:.1f} ms per {args.batch}-attempt batch '
+          f'({flushes} flushes)')
+
+    with connection() as conn:
+        rows = conn.execute('SELECT puzzle_id, clue_id, attempts, solves, time_count, time_mean, time_m2 '
+                            'FROM clue_stats').fetchall()
+    worst = 0.0
+    for puzzle_id, clue_id, attempts, solves, count, mean, m2 in rows:
+        samples = raw[(puzzle_id, clue_id)]
+        times = [seconds for _, seconds in samples]
+        assert attempts == len(samples) and solves == sum(solved for solved, _ in samples)
+        worst = max(worst, abs(mean - statistics.fmean(times)),
+                    abs(m2 / (count - 1) - statistics.variance(times)) if count > 1 else 0.0)
+    print(f'{len(rows)} clue rows, largest mean/variance error vs recomputation: {worst:.2e}')
+
+    puzzle_ids = [str(p) for p in range(args.puzzles)]
+    start = time.perf_counter()
+    for puzzle_id in puzzle_ids:
+        clue_stats.estimates(puzzle_id)
+    cold = (time.perf_counter() - start) / len(puzzle_ids)
+    start = time.perf_counter()
+    for _ in range(10):
+        for puzzle_id in puzzle_ids:
+            clue_stats.estimates(puzzle_id)
+    cached = (time.perf_counter() - start) / (10 * len(puzzle_ids))
+    print(f'estimates: {cold * 1e6:.1f} µs cold, {cached * 1e6:.2f} µs from snapshot')
+
+
+if __name__ == '__main__':
+    with workdir:
+        main()
@@ -0,0 +1,82 @@
+"""Reruns per second spent on database work, before and after pooling.
+
+Usage: python benchmarks/bench_db_rerun.py [--seconds 3]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import stats
+
+
+def legacy_rerun(path: str):
+    """What every landing-page rerun used to do: connect, run DDL, connect, query"""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_score INTEGER, ai_score INTEGER, difficulty TEXT,
+            winner TEXT, game_date TIMESTAMP, duration_seconds INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS player_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            total_games INTEGER DEFAULT 0, total_wins INTEGER DEFAULT 0,
+            total_score INTEGER DEFAULT 0, win_streak INTEGER DEFAULT 0,
+            best_streak INTEGER DEFAULT 0, last_updated TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM player_stats WHERE id = 1')
+    cursor.fetchone()
+    conn.close()
+
+
+def pooled_rerun(path: str):
+    database.init_database(path)
+    stats.get_player_stats()
+
+
+def measure(fn, path: str, seconds: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        fn(path)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        pooled_path = os.path.join(tmp, 'pooled.db')
+        database.DB_PATH = pooled_path
+
+        before = measure(legacy_rerun, legacy_path, args.seconds)
+        after = measure(pooled_rerun, pooled_path, args.seconds)
+        database.get_pool(pooled_path).close()
+
+    print(f'legacy connect-per-call: {before:10.0f} reruns/s')
+    print(f'pooled + one-time init:  {after:10.0f} reruns/s')
+    print(f'speedup:                 {after / before:10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
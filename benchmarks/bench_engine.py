@@ -0,0 +1,46 @@
+"""Simulated attempts per second through the headless GameEngine.
+
+Usage: python benchmarks/bench_engine.py [--games 50000] [--seed 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def run(games: int, seed: int) -> int:
+    rng = random.Random(seed)
+    engine = GameEngine(rng=rng)
+    attempts = 0
+    for i in range(games):
+        engine.start(DIFFICULTIES[i % 3])
+        while not engine.is_over():
+            clue = engine.current_clue()
+            answer = clue['answer'] if rng.random() < 0.6 else 'WRONG'
+            engine.submit(clue['id'], answer)
+            attempts += 1
+    return attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    attempts = run(args.games, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f'{args.games} games, {attempts} attempts in {elapsed:.2f}s')
+    print(f'{attempts / elapsed:,.0f} attempts/s  ({args.games / elapsed:,.0f} games/s)')
+
+
+if __name__ == '__main__':
+    main()
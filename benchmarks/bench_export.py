@@ -0,0 +1,59 @@
+"""Export throughput (rows/s) and peak memory at two table sizes.
+
+Peak traced memory should stay the same when the table grows tenfold.
+
+Usage: python benchmarks/bench_export.py [--rows 200000,2000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from bench_leaderboard import SEED_SQL
+from export import export_games
+
+
+class NullWriter:
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text: str):
+        self.bytes += len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='200000,2000000')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, 'export.db')
+        database.init_database()
+        seeded = 0
+        for target in (int(r) for r in args.rows.split(',')):
+            with database.transaction() as conn:
+                while seeded < target:
+                    step = min(1_000_000, target - seeded)
+                    conn.execute(SEED_SQL, (seeded + 1, seeded + step))
+                    seeded += step
+            for fmt in ('csv', 'jsonl'):
+                out = NullWriter()
+                start = time.perf_counter()
+                export_games(out, fmt)
+                elapsed = time.perf_counter() - start
+                # Separate pass: tracemalloc slows the export down too much to time it
+                tracemalloc.start()
+                export_games(NullWriter(), fmt)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f'{target:>10,} rows {fmt:>5}: {target / elapsed:>10,.0f} rows/s, '
+                      f'{out.bytes / elapsed / 1e6:6.1f} MB/s, peak {peak / 1e6:5.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Near-miss answer check latency against the size of the alternate-answer list.
+
+Compares the deletion-neighbourhood FuzzyIndex with checking every accepted
+answer's edit distance in turn.
+
+Usage: python benchmarks/bench_fuzzy.py [--sizes 10,1000,50000] [--guesses 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_layout import pseudo_words
+from fuzzy import FuzzyIndex, allowed_distance, canonical, edit_distance
+
+
+def typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    edit = rng.choice(('drop', 'swap', 'replace'))
+    if edit == 'drop':
+        return word[:i] + word[i + 1:]
+    if edit == 'swap' and i + 1 < len(word):
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') + word[i + 1:]
+
+
+def scan(answers, guess: str):
+    key = canonical(guess)
+    best = None
+    for number, answer in enumerate(answers):
+        limit = allowed_distance(len(answer))
+        distance = edit_distance(key, answer, limit)
+        if distance <= limit and (best is None or distance < best[1]):
+            best = (number, distance)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,1000,50000')
+    parser.add_argument('--guesses', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f'{"answers":>8} {"build ms":>9} {"index us":>9} {"scan us":>9}')
+    for size in (int(s) for s in args.sizes.split(',')):
+        answers = pseudo_words(rng, size, 12)
+        start = time.perf_counter()
+        index = FuzzyIndex(answers)
+        build = (time.perf_counter() - start) * 1000
+        guesses = [typo(rng.choice(answers), rng) for _ in range(args.guesses)]
+
+        timings = []
+        for guess in guesses:
+            start = time.perf_counter()
+            index.match(guess)
+            timings.append((time.perf_counter() - start) * 1e6)
+        scan_guesses = guesses[:max(1, args.guesses * 10 // size)] if size > 1000 else guesses
+        start = time.perf_counter()
+        for guess in scan_guesses:
+            scan(index.answers, guess)
+        scanned = (time.perf_counter() - start) / len(scan_guesses) * 1e6
+        print(f'{size:>8} {build:>9.1f} {statistics.median(timings):>9.1f} {scanned:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Grid render time per rerun for a generated 25x25 puzzle.
+
+Plays through every clue, alternating player and AI solves, and times the
+first render of each new position (skeleton copy plus changed cells) and a
+repeat render of the same position (a rerun with no progress).
+
+Usage: python benchmarks/bench_grid_render.py [--size 25] [--words 400] [--seed 1]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import puzzle_bank
+from bench_layout import pseudo_words
+from game_engine import GameState
+from grid_render import get_renderer, render_grid
+from layout import generate_layout
+from puzzle_bank import PuzzleBank
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=25)
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = [(word, f'Clue for {word}') for word in pseudo_words(rng, args.words, 12)]
+    puzzle = generate_layout(entries, (args.size, args.size), rng=rng, time_budget=1.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.db')
+        PuzzleBank(path).add_puzzles([('hard', puzzle)])
+        puzzle_bank._bank = PuzzleBank(path)
+        puzzle_id = puzzle_bank._bank.get('hard', 0)['puzzle_id']
+
+        start = time.perf_counter()
+        get_renderer(puzzle_id)
+        skeleton_ms = (time.perf_counter() - start) * 1000
+
+        state = GameState('hard', puzzle_id)
+        fresh, repeat = [], []
+        for position in range(len(puzzle['clues'])):
+            state.current_clue_index = position
+            start = time.perf_counter()
+            html = render_grid(state)
+            fresh.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            render_grid(state)
+            repeat.append((time.perf_counter() - start) * 1000)
+            if position % 2:
+                state.player_mask |= 1 << position
+            else:
+                state.solved_mask |= 1 << position
+
+    print(f'{args.size}x{args.size} grid, {len(puzzle["clues"])} clues, {len(html) / 1024:.0f} KiB of HTML')
+    print(f'skeleton build: {skeleton_ms:.2f} ms (once per puzzle)')
+    print(f'new position:   median {statistics.median(fresh):.3f} ms  max {max(fresh):.3f} ms')
+    print(f'same position:  median {statistics.median(repeat) * 1000:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
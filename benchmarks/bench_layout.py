@@ -0,0 +1,65 @@
+"""Layout generation time for 12x12 grids.
+
+Without --words, uses pseudo-words drawn with English letter frequencies.
+
+Usage: python benchmarks/bench_layout.py [--words words.txt] [--size 12] [--layouts 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import generate_layout, validate_puzzle
+
+LETTER_WEIGHTS = {
+    'E': 12.7, 'T': 9.1, 'A': 8.2, 'O': 7.5, 'I': 7.0, 'N': 6.7, 'S': 6.3, 'H': 6.1, 'R': 6.0,
+    'D': 4.3, 'L': 4.0, 'C': 2.8, 'U': 2.8, 'M': 2.4, 'W': 2.4, 'F': 2.2, 'G': 2.0, 'Y': 2.0,
+    'P': 1.9, 'B': 1.5, 'V': 1.0, 'K': 0.8, 'J': 0.2, 'X': 0.2, 'Q': 0.1, 'Z': 0.1,
+}
+
+
+def pseudo_words(rng: random.Random, count: int, max_length: int):
+    letters = list(LETTER_WEIGHTS)
+    weights = list(LETTER_WEIGHTS.values())
+    return [''.join(rng.choices(letters, weights, k=rng.randint(3, max_length))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words')
+    parser.add_argument('--size', type=int, default=12)
+    parser.add_argument('--layouts', type=int, default=200)
+    parser.add_argument('--per-layout', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.words:
+        with open(args.words, encoding='utf-8') as handle:
+            pool = [w.strip() for w in handle if 3 <= len(w.strip()) <= args.size]
+    else:
+        pool = pseudo_words(rng, 5000, min(args.size, 9))
+
+    timings = []
+    placed = []
+    for _ in range(args.layouts):
+        words = rng.sample(pool, args.per_layout)
+        start = time.perf_counter()
+        puzzle = generate_layout([(w, w) for w in words], (args.size, args.size), rng=rng)
+        timings.append((time.perf_counter() - start) * 1000)
+        placed.append(len(puzzle['clues']))
+        assert not validate_puzzle(puzzle, strict=True), validate_puzzle(puzzle, strict=True)
+
+    timings.sort()
+    print(f'{args.layouts} layouts of {args.per_layout} words on {args.size}x{args.size}')
+    print(f'median {statistics.median(timings):.1f} ms, p95 {timings[int(len(timings) * 0.95)]:.1f} ms, '
+          f'max {timings[-1]:.1f} ms')
+    print(f'words placed: mean {statistics.mean(placed):.1f} of {args.per_layout}')
+
+
+if __name__ == '__main__':
+    main()
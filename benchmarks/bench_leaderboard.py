@@ -0,0 +1,93 @@
+"""Leaderboard and history query latency as game_stats grows to 10M rows.
+
+Seeds game_stats in SQL (recursive CTE) up to each checkpoint, rebuilds the
+daily_stats rollup for the seeded rows, and times every leaderboard query.
+Flat latency across checkpoints means the queries are index-bound.
+
+Usage: python benchmarks/bench_leaderboard.py [--checkpoints 100000,1000000,10000000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import leaderboard
+
+SEED_SQL = '''
+    WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    INSERT INTO game_stats (player_id, player_score, ai_score, difficulty, winner, game_date, duration_seconds)
+    SELECT 'player-' || (abs(random()) % 50000),
+           5 * (abs(random()) % 6),
+           5 * (abs(random()) % 6),
+           CASE i % 3 WHEN 0 THEN 'easy' WHEN 1 THEN 'medium' ELSE 'hard' END,
+           CASE abs(random()) % 3 WHEN 0 THEN 'Player' WHEN 1 THEN 'AI' ELSE 'Draw' END,
+           datetime('now', '-' || (abs(random()) % 365) || ' days', '-' || (abs(random()) % 86400) || ' seconds'),
+           abs(random()) % 300
+    FROM n
+'''
+
+ROLLUP_SQL = '''
+    INSERT OR REPLACE INTO daily_stats
+    SELECT date(game_date), difficulty, COUNT(*),
+           SUM(winner = 'Player'), SUM(winner = 'AI'), SUM(winner = 'Draw'),
+           SUM(player_score), SUM(ai_score), SUM(duration_seconds), MAX(player_score)
+    FROM game_stats GROUP BY date(game_date), difficulty
+'''
+
+PLAYER_SQL = '''
+    INSERT OR REPLACE INTO player_stats (player_id, total_games, total_wins, total_score, win_streak, best_streak)
+    SELECT player_id, COUNT(*), SUM(winner = 'Player'), SUM(player_score), 0, 0
+    FROM game_stats GROUP BY player_id
+'''
+
+
+def time_query(fn, repeat: int = 200) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--checkpoints', default='100000,1000000,10000000')
+    parser.add_argument('--db', help='reuse this database file instead of a temporary one')
+    args = parser.parse_args()
+    checkpoints = [int(c) for c in args.checkpoints.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = args.db or os.path.join(tmp, 'leaderboard.db')
+        database.init_database()
+        queries = {
+            'top_scores(hard)': lambda: leaderboard.top_scores('hard'),
+            'top_players()': lambda: leaderboard.top_players(),
+            'recent_games(player)': lambda: leaderboard.recent_games('player-42'),
+            'recent_games()': lambda: leaderboard.recent_games(),
+            'games_between(1 day)': lambda: leaderboard.games_between('2026-01-01', '2026-01-02'),
+            'daily_summary(30)': lambda: leaderboard.daily_summary(30),
+        }
+        print(f'{"rows":>12} ' + ' '.join(f'{name:>22}' for name in queries) + '   (median us)')
+        seeded = 0
+        for target in checkpoints:
+            start = time.perf_counter()
+            with database.transaction() as conn:
+                while seeded < target:
+                    step = min(1_000_000, target - seeded)
+                    conn.execute(SEED_SQL, (seeded + 1, seeded + step))
+                    seeded += step
+                conn.execute(ROLLUP_SQL)
+                conn.execute(PLAYER_SQL)
+            seed_time = time.perf_counter() - start
+            timings = [time_query(fn) for fn in queries.values()]
+            print(f'{target:>12,} ' + ' '.join(f'{t:>22.1f}' for t in timings) + f'   (seeded in {seed_time:.0f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Overhead of the metrics layer, disabled and enabled.
+
+Times an empty timed() block and a trivial SQLite statement through a plain
+and an instrumented connection.
+
+Usage: python benchmarks/bench_metrics.py [--iterations 200000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from metrics import TimedConnection, timed
+
+
+def per_call_ns(func, iterations: int) -> float:
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def empty_blocks(iterations: int):
+    for _ in range(iterations):
+        with timed('bench'):
+            pass
+
+
+def bare_loop(iterations: int):
+    for _ in range(iterations):
+        pass
+
+
+def statements(conn: sqlite3.Connection):
+    def run(iterations: int):
+        for _ in range(iterations):
+            conn.execute('SELECT 1')
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    base = per_call_ns(bare_loop, n)
+    with metrics.enabled(False):
+        disabled = per_call_ns(empty_blocks, n)
+    with metrics.enabled(True):
+        enabled = per_call_ns(empty_blocks, n)
+    print(f'timed() block:   disabled {disabled - base:6.0f} ns   enabled {enabled - base:6.0f} ns')
+
+    plain = per_call_ns(statements(sqlite3.connect(':memory:')), n)
+    instrumented = per_call_ns(statements(sqlite3.connect(':memory:', factory=TimedConnection)), n)
+    print(f'SELECT 1:        plain {plain:8.0f} ns   instrumented {instrumented:8.0f} ns '
+          f'(+{instrumented - plain:.0f} ns)')
+
+    for row in metrics.summary_rows():
+        print(f"{row['family']:>6} {row['name']:<10} n={row['count']:<8} "
+              f"p50 {row['p50_ms'] * 1000:6.2f} us  p99 {row['p99_ms'] * 1000:6.2f} us")
+
+
+if __name__ == '__main__':
+    main()
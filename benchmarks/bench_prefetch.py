@@ -0,0 +1,59 @@
+"""Click-to-game latency of GameEngine.start(), with and without prefetching.
+
+Uses a synthetic on-disk puzzle bank with a one-entry cache, so every
+synchronous start reads and decodes a puzzle. Between clicks the script
+sleeps --think-ms, standing in for the time a player spends on the winner
+screen, which is when the prefetcher refills.
+
+Usage: python benchmarks/bench_prefetch.py [--puzzles 30000] [--clicks 300] [--think-ms 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_engine
+import puzzle_bank
+from bench_puzzle_bank import DIFFICULTIES, synthetic_puzzles
+from game_engine import GameEngine, prefetch_games
+from puzzle_bank import PuzzleBank
+
+
+def clicks(engine: GameEngine, count: int, think_ms: float, prefetch: bool) -> list:
+    latencies = []
+    for i in range(count):
+        if prefetch:
+            prefetch_games()  # what the winner screen does
+        time.sleep(think_ms / 1000)
+        started = time.perf_counter()
+        engine.start(DIFFICULTIES[i % 3])
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--puzzles', type=int, default=30000)
+    parser.add_argument('--clicks', type=int, default=300)
+    parser.add_argument('--think-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.db')
+        PuzzleBank(path).add_puzzles(synthetic_puzzles(args.puzzles))
+        puzzle_bank._bank = PuzzleBank(path, cache_size=1)
+        engine = GameEngine()
+
+        for label in ('synchronous', 'prefetched'):
+            latencies = clicks(engine, args.clicks, args.think_ms, label == 'prefetched')
+            print(f'{label:>12}: median {statistics.median(latencies):7.1f} us  '
+                  f'p99 {latencies[int(len(latencies) * 0.99)]:7.1f} us')
+        print(f'buffered after run: {game_engine._prefetcher.buffered()}')
+
+
+if __name__ == '__main__':
+    main()
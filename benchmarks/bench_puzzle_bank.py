@@ -0,0 +1,71 @@
+"""Puzzle bank build size and random-pick latency with a 100k-puzzle bank.
+
+Usage: python benchmarks/bench_puzzle_bank.py [--puzzles 100000] [--picks 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from puzzle_bank import PuzzleBank
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def synthetic_puzzles(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    for i in range(count):
+        clues = [
+            {'id': c + 1, 'clue': f'Synthetic clue {i}-{c}',
+             'answer': ''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))),
+             'row': c * 2, 'col': 0, 'direction': 'across', 'points': 5}
+            for c in range(5)
+        ]
+        yield DIFFICULTIES[i % 3], {'grid_size': (12, 12), 'clues': clues}
+
+
+def time_picks(bank: PuzzleBank, picks: int) -> float:
+    start = time.perf_counter()
+    for i in range(picks):
+        bank.random_puzzle(DIFFICULTIES[i % 3])
+    return (time.perf_counter() - start) / picks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--puzzles', type=int, default=100000)
+    parser.add_argument('--picks', type=int, default=20000)
+    parser.add_argument('--cache-size', type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.db')
+        start = time.perf_counter()
+        PuzzleBank(path).add_puzzles(synthetic_puzzles(args.puzzles))
+        build = time.perf_counter() - start
+        print(f'built {args.puzzles:,} puzzles in {build:.2f}s, {os.path.getsize(path) / 1e6:.1f} MB on disk')
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        bank = PuzzleBank(path, cache_size=args.cache_size, rng=random.Random(1))
+        first = bank.random_puzzle('hard')
+        open_us = (time.perf_counter() - start) * 1e6
+        uncached = time_picks(bank, args.picks)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'open + first pick: {open_us:8.1f} us (puzzle {first["puzzle_id"]})')
+        print(f'random pick, cache {args.cache_size:>6}: {uncached:8.1f} us/pick, peak heap {peak / 1e6:.2f} MB')
+
+        warm = PuzzleBank(path, cache_size=args.puzzles, rng=random.Random(1))
+        time_picks(warm, args.picks)
+        print(f'random pick, cache {args.puzzles:>6}: {time_picks(warm, args.picks):8.1f} us/pick (second pass)')
+
+
+if __name__ == '__main__':
+    main()
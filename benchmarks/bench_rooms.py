@@ -0,0 +1,186 @@
+"""Load test for room_server.py: thousands of concurrent multiplayer rooms.
+
+Starts the room server in a subprocess, then opens --players connections
+for each of --rooms rooms (plus the AI in every --ai-every'th room) from
+this process's event loop. Every client waits a random 0..--think seconds
+before answering each clue, so all rooms are mid-game at the same time.
+
+Reported: peak rooms in play and open connections, games finished,
+submit-to-result latency (for the answer that closes a round), delay of
+broadcasts from server to client, and the server's CPU time from
+/proc/<pid>/stat (Linux).
+
+Usage: python benchmarks/bench_rooms.py [--rooms 2000] [--players 2] [--think 2.0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from crossword import CrosswordData  # noqa: E402
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+ANSWERS = {clue['clue']: clue['answer'] for puzzle in CrosswordData.PUZZLES.values() for clue in puzzle['clues']}
+
+
+class Results:
+    def __init__(self):
+        self.round_latency: List[float] = []
+        self.broadcast_delay: List[float] = []
+        self.finished = 0
+        self.errors: List[str] = []
+        self.peak: Dict[str, int] = {}
+
+
+async def player(port: int, room: str, name: str, difficulty: str, seats: int, ai: bool,
+                 think: float, accuracy: float, rng: random.Random, connect_limit: asyncio.Semaphore,
+                 results: Results):
+    async with connect_limit:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=1 << 20)
+    writer.write((json.dumps({'op': 'join', 'room': room, 'name': name, 'difficulty': difficulty,
+                              'seats': seats, 'ai': ai}) + '\n').encode())
+    answered_round = -1
+    submitted_at = 0.0
+    pending = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                results.errors.append(f'{room}/{name}: disconnected')
+                return
+            received = time.time()
+            message = json.loads(line)
+            if message['type'] == 'error':
+                results.errors.append(f'{room}/{name}: {message["message"]}')
+                return
+            results.broadcast_delay.append(received - message['sent'])
+            last_round = message['last_round']
+            if last_round and last_round['closed_by'] == name and message['round'] == answered_round + 1:
+                results.round_latency.append(time.perf_counter() - submitted_at)
+            if message['status'] == 'finished':
+                results.finished += 1
+                return
+            if message['status'] == 'playing' and message['round'] > answered_round and pending is None:
+                answered_round = message['round']
+                clue = message['clue']
+                right = ANSWERS.get(clue['clue'], 'WRONG')
+
+                async def answer(clue_id=clue['id'], text=right if rng.random() < accuracy else 'WRONG'):
+                    nonlocal submitted_at, pending
+                    await asyncio.sleep(rng.uniform(0, think))
+                    submitted_at = time.perf_counter()
+                    writer.write((json.dumps({'op': 'submit', 'clue_id': clue_id, 'answer': text}) + '\n').encode())
+                    pending = None
+
+                pending = asyncio.ensure_future(answer())
+    finally:
+        writer.close()
+
+
+async def monitor(port: int, peak: Dict[str, int], stop: asyncio.Event):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while not stop.is_set():
+        writer.write(b'{"op": "stats"}\n')
+        stats = json.loads(await reader.readline())
+        for key in ('playing', 'connections'):
+            peak[key] = max(peak.get(key, 0), stats[key])
+        try:
+            await asyncio.wait_for(stop.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+    writer.close()
+
+
+async def drive(args, port: int) -> Results:
+    results = Results()
+    rng = random.Random(args.seed)
+    connect_limit = asyncio.Semaphore(256)
+    stop = asyncio.Event()
+    watcher = asyncio.ensure_future(monitor(port, results.peak, stop))
+    clients = []
+    for number in range(args.rooms):
+        ai = args.ai_every > 0 and number % args.ai_every == 0
+        difficulty = DIFFICULTIES[number % 3]
+        for seat in range(args.players):
+            clients.append(player(port, f'room-{number}', f'p{seat}', difficulty, args.players, ai,
+                                  args.think, args.accuracy, rng, connect_limit, results))
+    await asyncio.gather(*clients)
+    stop.set()
+    await watcher
+    return results
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f'/proc/{pid}/stat') as handle:
+        fields = handle.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--players', type=int, default=2, help='human players per room')
+    parser.add_argument('--ai-every', type=int, default=2, help='add the AI to every Nth room (0: never)')
+    parser.add_argument('--think', type=float, default=2.0, help='longest pause before answering, seconds')
+    parser.add_argument('--accuracy', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # Two sockets per player across both processes, plus headroom
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = args.rooms * args.players + 256
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    workdir = tempfile.TemporaryDirectory(prefix='crossword-rooms-')
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'room_server.py'), '--port', str(port)],
+                              cwd=workdir.name, stdout=subprocess.PIPE, text=True)
+    try:
+        server.stdout.readline()  # "listening on ..."
+        cpu_before = cpu_seconds(server.pid)
+        start = time.perf_counter()
+        results = asyncio.run(drive(args, port))
+        elapsed = time.perf_counter() - start
+        server_cpu = cpu_seconds(server.pid) - cpu_before
+    finally:
+        server.terminate()
+        server.wait()
+        workdir.cleanup()
+
+    rounds = len(results.round_latency)
+    print(f'{args.rooms} rooms x {args.players} players ({results.peak.get("playing", 0)} playing at peak, '
+          f'{results.peak.get("connections", 0)} connections) in {elapsed:.1f}s')
+    print(f'games finished: {results.finished // args.players} rooms, {rounds / elapsed:.0f} rounds/s, '
+          f'{len(results.broadcast_delay) / elapsed:.0f} updates/s delivered')
+    print(f'submit -> result:   p50 {percentile(results.round_latency, 0.5) * 1e3:.1f} ms, '
+          f'p99 {percentile(results.round_latency, 0.99) * 1e3:.1f} ms')
+    print(f'broadcast delay:    p50 {percentile(results.broadcast_delay, 0.5) * 1e3:.1f} ms, '
+          f'p99 {percentile(results.broadcast_delay, 0.99) * 1e3:.1f} ms')
+    print(f'server CPU: {server_cpu:.1f}s ({server_cpu / elapsed:.0%} of one core), '
+          f'{server_cpu / max(rounds, 1) * 1e6:.0f} us per round')
+    if results.errors:
+        print(f'{len(results.errors)} client errors, e.g. {results.errors[0]}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Bytes of Python heap per simulated session, measured with tracemalloc.
+
+Each session is what streamlit_app.py keeps in st.session_state: the
+GameEngine and the answer typed into the current clue's text input, with a
+game started and a couple of attempts played.
+
+Usage: python benchmarks/bench_session_memory.py [--sessions 10000] [--attempts 2]
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def new_session(i: int, attempts: int, rng: random.Random) -> dict:
+    engine = GameEngine(player_id=uuid.uuid4().hex)
+    engine.start(DIFFICULTIES[i % 3])
+    for _ in range(attempts):
+        clue = engine.current_clue()
+        engine.submit(clue['id'], clue['answer'] if rng.random() < 0.5 else 'WRONG')
+    return {'engine': engine, f'answer_{engine.state.current_clue_index}': 'GUESS'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--attempts', type=int, default=2)
+    parser.add_argument('--top', type=int, default=5, help='show the largest allocation sites')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    new_session(0, args.attempts, rng)  # warm module-level caches first
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = [new_session(i, args.attempts, rng) for i in range(args.sessions)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    print(f'{len(sessions)} sessions: {used / 1024:,.0f} KiB, {used / len(sessions):,.0f} bytes/session')
+    for stat in after.compare_to(before, 'lineno')[:args.top]:
+        print(f'  {stat.size_diff / len(sessions):8,.0f} B/session  {stat.traceback}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Cold start and per-rerun time of the Streamlit app, with an import-time report.
+
+Runs the app in a fresh `python -X importtime` subprocess with AppTest,
+against a throwaway database. Streamlit itself is imported first, as the
+server would have it loaded before any session, so the report covers what
+the app adds: the imports made by its first run (cumulative time of each
+top-level import and the slowest modules by self time), the first run
+(first paint of a new worker), then --reruns reruns of the landing page and
+of a game screen. Rerun times are given as seen by AppTest and, with
+metrics.py forced on, as timed inside the app.
+
+Usage: python benchmarks/bench_startup.py [--reruns 50] [--top 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, 'streamlit_app.py')
+MARKER = 'bench_startup: app starts here'
+
+
+def child(reruns: int):
+    from streamlit.testing.v1 import AppTest  # loads Streamlit before MARKER
+
+    import metrics
+
+    print(MARKER, file=sys.stderr, flush=True)
+    timings: Dict[str, List[float]] = {'first run': [], 'landing rerun': [], 'game rerun': []}
+    in_app: Dict[str, float] = {}
+    at = AppTest.from_file(APP, default_timeout=60)
+
+    def run(label: str, target):
+        started = time.perf_counter()
+        target.run()
+        timings[label].append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    def measure(label: str):
+        histogram = metrics.registry.snapshot()[0].get(('timer', 'rerun'))
+        if histogram is not None:
+            in_app[label] = histogram.total / histogram.count
+        metrics.registry.reset()
+
+    run('first run', at)
+    measure('first run')
+    for _ in range(reruns):
+        run('landing rerun', at)
+    measure('landing rerun')
+    next(button for button in at.button if 'Easy Mode' in button.label).click().run()
+    metrics.registry.reset()
+    for _ in range(reruns):
+        run('game rerun', at)
+    measure('game rerun')
+    print(json.dumps({'driver': timings, 'in_app': in_app}))
+
+
+def parse_importtime(lines: List[str]) -> List[Tuple[int, int, int, str]]:
+    """(self us, cumulative us, depth, module) for each `import time:` line"""
+    imports = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((int(own), int(cumulative), depth, name.strip()))
+    return imports
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=50, help='reruns of each screen to time')
+    parser.add_argument('--top', type=int, default=10, help='imports to list')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.reruns)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='crossword-startup-') as workdir:
+        env = dict(os.environ, CROSSWORD_METRICS='1', CROSSWORD_DB_PATH=os.path.join(workdir, 'startup.db'),
+                   PYTHONPATH=os.pathsep.join(filter(None, (ROOT, os.environ.get('PYTHONPATH')))))
+        started = time.perf_counter()
+        done = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--child',
+                               '--reruns', str(args.reruns)], cwd=workdir, env=env, capture_output=True, text=True)
+        process = time.perf_counter() - started
+    if done.returncode != 0:
+        sys.exit(done.stderr[-4000:])
+    stderr = done.stderr.splitlines()
+    app_lines = stderr[stderr.index(MARKER) + 1:]
+    imports = parse_importtime(app_lines)
+    report = json.loads(done.stdout.splitlines()[-1])
+
+    top_level = [entry for entry in imports if entry[2] == 0]
+    total = sum(entry[1] for entry in top_level)
+    print(f'process total {process:.2f}s; imports by the app: {len(imports)} modules, {total / 1e3:.1f} ms')
+    print(f'{"top-level import":40}{"cumulative ms":>14}')
+    for own, cumulative, depth, name in sorted(top_level, key=lambda entry: -entry[1])[:args.top]:
+        print(f'{name:40}{cumulative / 1e3:14.1f}')
+    print(f'{"slowest modules":40}{"self ms":>14}')
+    for own, cumulative, depth, name in sorted(imports, key=lambda entry: -entry[0])[:args.top]:
+        print(f'{name:40}{own / 1e3:14.1f}')
+    print(f'{"":24}{"count":>8}{"p50 ms":>10}{"p90 ms":>10}{"max ms":>10}{"in-app mean":>13}')
+    for label, values in report['driver'].items():
+        in_app = report['in_app'].get(label)
+        print(f'{label:24}{len(values):8d}' + ''.join(
+            f'{percentile(values, q) * 1e3:10.1f}' for q in (0.5, 0.9, 1.0))
+            + (f'{in_app * 1e3:13.1f}' if in_app is not None else ''))
+
+
+if __name__ == '__main__':
+    main()
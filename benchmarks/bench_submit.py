@@ -0,0 +1,87 @@
+"""Submit cost against puzzle size: compiled puzzles versus the old linear scans.
+
+The old path looked the clue up with next() over the clue list, rebuilt an
+`available_clues` list and re-normalized the stored answer on every submit;
+it is reproduced here as `linear_submit`. Every submit targets the last clue,
+the worst case for a scan.
+
+Usage: python benchmarks/bench_submit.py [--sizes 5,50,500] [--submits 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import puzzle_bank
+from crossword import AIPlayer
+from game_engine import GameEngine
+from puzzle_bank import PuzzleBank
+
+
+def big_puzzle(clue_count: int, rng: random.Random) -> dict:
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    size = max(12, clue_count)
+    clues = [
+        {'id': i + 1, 'clue': f'Clue {i}', 'answer': ''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))),
+         'row': i % size, 'col': 0, 'direction': 'across', 'points': 5}
+        for i in range(clue_count)
+    ]
+    return {'grid_size': (size, size), 'clues': clues}
+
+
+def linear_submit(puzzle: dict, solved: set, ai: AIPlayer, clue_id: int, answer: str) -> int:
+    clues = puzzle['clues']
+    clue = next((c for c in clues if c['id'] == clue_id), None)
+    score = 0
+    if clue and answer.upper().strip() == clue['answer']:
+        score += 5
+    available_clues = [c for c in clues if c['id'] == clue_id and c['id'] not in solved]
+    if available_clues and ai.attempt_answer(available_clues[0]):
+        solved.discard(clue_id)  # keep the clue available for the next round
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='5,50,500')
+    parser.add_argument('--submits', type=int, default=20000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.db')
+        bank = PuzzleBank(path)
+        bank.add_puzzles(('easy', big_puzzle(size, rng)) for size in sizes)
+        puzzle_bank._bank = PuzzleBank(path)
+
+        print(f'{"clues":>6} {"linear us":>10} {"compiled us":>12}')
+        for seq, size in enumerate(sizes):
+            puzzle = puzzle_bank._bank.get('easy', seq)
+            last = puzzle['clues'][-1]
+            ai = AIPlayer('easy', rng=random.Random(2))
+
+            start = time.perf_counter()
+            for _ in range(args.submits):
+                linear_submit(puzzle, set(), ai, last['id'], last['answer'].lower())
+            linear = (time.perf_counter() - start) / args.submits * 1e6
+
+            engine = GameEngine(rng=random.Random(2))
+            engine.start('easy')
+            state = engine.state
+            state.puzzle_id = puzzle['puzzle_id']
+            start = time.perf_counter()
+            for _ in range(args.submits):
+                state.attempt_count = state.solved_mask = 0
+                engine.submit(last['id'], last['answer'].lower())
+            compiled = (time.perf_counter() - start) / args.submits * 1e6
+
+            print(f'{size:>6} {linear:>10.2f} {compiled:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Word index build, load and pattern-query speed on a 200k-word list.
+
+Without --words, uses unique pseudo-words drawn with English letter frequencies.
+
+Usage: python benchmarks/bench_word_index.py [--words words.txt] [--count 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_layout import pseudo_words
+from word_index import WordIndex, read_word_list
+
+
+def random_pattern(rng: random.Random, word: str, fixed: int) -> str:
+    keep = set(rng.sample(range(len(word)), min(fixed, len(word))))
+    return ''.join(ch if i in keep else '?' for i, ch in enumerate(word))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words')
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.words:
+        entries = list(read_word_list(args.words))
+    else:
+        words = set()
+        while len(words) < args.count:
+            words.update(pseudo_words(rng, args.count - len(words), 12))
+        entries = [(w, '') for w in words]
+
+    start = time.perf_counter()
+    index = WordIndex.build(entries)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'words.idx')
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        mapped = WordIndex.open(path)
+        load = time.perf_counter() - start
+
+        samples = [w for w, _ in rng.sample(entries, 1000)]
+        print(f'{len(index):,} words: build {build:.2f}s, file {size / 1e6:.1f} MB, mmap open {load * 1e3:.2f} ms')
+        for fixed in (1, 2, 3):
+            patterns = [random_pattern(rng, rng.choice(samples), fixed) for _ in range(args.queries)]
+            matches = 0
+            start = time.perf_counter()
+            for pattern in patterns:
+                matches += mapped.count(pattern)
+            elapsed = time.perf_counter() - start
+            print(f'{fixed} fixed letter(s): {elapsed / args.queries * 1e6:7.1f} us/query, '
+                  f'{matches / args.queries:8.1f} matches on average')
+
+        start = time.perf_counter()
+        for pattern in patterns[:2000]:
+            mapped.match(pattern)
+        print(f'match() with word decoding: {(time.perf_counter() - start) / 2000 * 1e6:.1f} us/query')
+
+        start = time.perf_counter()
+        scanned = 0
+        for pattern in patterns[:200]:
+            scanned += sum(1 for w, _ in entries if len(w) == len(pattern)
+                           and all(p == '?' or p == c for p, c in zip(pattern, w)))
+        print(f'linear scan baseline:       {(time.perf_counter() - start) / 200 * 1e6:.1f} us/query, '
+              f'{scanned / 200:.1f} matches on average')
+        del mapped
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Multi-session load test of the Streamlit app with AppTest.
+
+Each worker process drives --sessions AppTest sessions of streamlit_app.py
+against one shared temporary database. A session loads the page, then
+plays --games games: a difficulty click, five Submit presses (right
+answers with probability --accuracy) and Play Again. A worker advances its
+sessions one rerun at a time in turn, so all of them are mid-game together,
+and the workers run in parallel from a common start barrier.
+
+Reported:
+- rerun latency as seen by the driver (script run plus AppTest overhead)
+  and as timed inside the app by metrics.py
+- SQLite write-lock waits: time spent in BEGIN IMMEDIATE, which is where
+  busy_timeout waits happen, plus any SQLite errors
+- games per second, counted from game_stats rows
+
+Sessions choose difficulties and answers from --seed, and each worker seeds
+the AI's generator, so runs with the same arguments play the same moves up
+to thread timing. CROSSWORD_* variables in the environment apply to every
+worker (e.g. CROSSWORD_WRITE_BEHIND=1); CROSSWORD_METRICS is forced on.
+
+Usage: python benchmarks/load_test.py [--processes 4] [--sessions 16] [--games 2]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from typing import Dict, Iterator, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, 'streamlit_app.py')
+RERUN_TIMEOUT = 60
+DIFFICULTY_BUTTONS = ('Easy Mode', 'Medium Mode', 'Hard Mode')
+LOCK_STATEMENT = 'BEGIN IMMEDIATE'
+
+HistogramState = Tuple[List[int], int, float]
+
+
+def find_button(at, label: str):
+    for button in at.button:
+        if label in button.label:
+            return button
+    raise LookupError(f'no {label!r} button on the page')
+
+
+def play(at, games: int, accuracy: float, rng: random.Random, latencies: List[float]) -> Iterator[None]:
+    """One session's reruns, yielding after each so the worker can interleave sessions"""
+    from game_engine import MAX_ATTEMPTS
+
+    def rerun(target):
+        started = time.perf_counter()
+        target.run()
+        latencies.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    rerun(at)
+    yield
+    for _ in range(games):
+        rerun(find_button(at, rng.choice(DIFFICULTY_BUTTONS)).click())
+        yield
+        for _ in range(MAX_ATTEMPTS):
+            clue = at.session_state['engine'].current_clue()
+            at.text_input[0].input(clue['answer'] if rng.random() < accuracy else 'WRONG')
+            rerun(find_button(at, 'Submit').click())
+            yield
+        if not any('Play Again' in button.label for button in at.button):
+            # The last Submit does not rerun; the result screen shows on the next interaction
+            rerun(at)
+            yield
+        rerun(find_button(at, 'Play Again').click())
+        yield
+
+
+def run_worker(worker: int, workdir: str, sessions: int, games: int, accuracy: float, seed: int,
+               barrier, results):
+    try:
+        results.put(drive_sessions(worker, workdir, sessions, games, accuracy, seed, barrier))
+    except BaseException:
+        barrier.abort()
+        results.put(traceback.format_exc())
+        raise
+
+
+def drive_sessions(worker: int, workdir: str, sessions: int, games: int, accuracy: float, seed: int, barrier):
+    os.chdir(workdir)
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    import game_engine
+    import metrics
+
+    game_engine._shared_rng.seed(seed * 1000 + worker)
+    rng = random.Random(seed * 1000 + worker)
+    # Import the app's modules and warm its process-wide caches outside the measurement
+    AppTest.from_file(APP, default_timeout=RERUN_TIMEOUT).run()
+    metrics.registry.reset()
+    # After the first run, which applies Streamlit's config: hide its per-rerun deprecation notices
+    set_log_level('error')
+
+    latencies: List[float] = []
+    running = [play(AppTest.from_file(APP, default_timeout=RERUN_TIMEOUT), games, accuracy, rng, latencies)
+               for _ in range(sessions)]
+    barrier.wait()
+    while running:
+        for session in list(running):
+            try:
+                next(session)
+            except StopIteration:
+                running.remove(session)
+    histograms, counters = metrics.registry.snapshot()
+    return latencies, {key: (h.counts, h.count, h.total) for key, h in histograms.items()}, counters
+
+
+def merge(states: List[Dict[Tuple[str, str], HistogramState]], key: Tuple[str, str]):
+    from metrics import Histogram
+
+    merged = Histogram()
+    for state in states:
+        if key in state:
+            counts, count, total = state[key]
+            merged.counts = [a + b for a, b in zip(merged.counts, counts)]
+            merged.count += count
+            merged.total += total
+    return merged
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sessions', type=int, default=16, help='concurrent sessions per process')
+    parser.add_argument('--games', type=int, default=2, help='games per session')
+    parser.add_argument('--accuracy', type=float, default=0.6, help="chance of the player's answer being right")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=1800, help='seconds to wait for the workers')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix='crossword-load-') as workdir:
+        run(args, workdir)
+
+
+def run(args: argparse.Namespace, workdir: str):
+    db_path = os.path.join(workdir, 'load.db')
+    os.environ['CROSSWORD_DB_PATH'] = db_path
+    os.environ['CROSSWORD_METRICS'] = '1'
+    import database
+
+    database.init_database(db_path)
+    database.get_pool(db_path).close()
+
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(args.processes + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=run_worker, args=(worker, workdir, args.sessions, args.games, args.accuracy,
+                                             args.seed, barrier, results))
+        for worker in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    start = time.perf_counter()
+    try:
+        outputs = [results.get(timeout=args.timeout) for _ in procs]
+    except queue.Empty:
+        for proc in procs:
+            proc.kill()
+        sys.exit(f'workers did not finish within {args.timeout:.0f}s')
+    elapsed = time.perf_counter() - start
+    for proc in procs:
+        proc.join()
+    crashes = [output for output in outputs if isinstance(output, str)]
+    if crashes:
+        sys.exit(f'{len(crashes)} of {len(procs)} workers failed:\n{crashes[0]}')
+    failed = [proc.exitcode for proc in procs if proc.exitcode != 0]
+
+    with database.connection(db_path) as conn:
+        games = conn.execute('SELECT COUNT(*) FROM game_stats').fetchone()[0]
+    database.get_pool(db_path).close()
+    latencies = sorted(latency for output in outputs for latency in output[0])
+    states = [output[1] for output in outputs]
+    errors = sum(output[2].get('sql_errors', 0) for output in outputs)
+
+    sessions = args.processes * args.sessions
+    print(f'{sessions} sessions in {args.processes} processes, {games} games in {elapsed:.1f}s: '
+          f'{games / elapsed:.1f} games/s, {len(latencies) / elapsed:.0f} reruns/s')
+    print(f'{"":24}{"count":>8}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+    print(f'{"rerun (driver)":24}{len(latencies):8d}' + ''.join(
+        f'{percentile(latencies, q) * 1e3:10.1f}' for q in (0.5, 0.9, 0.99, 1.0)))
+    for label, key in (('rerun (in app)', ('timer', 'rerun')), ('rerun SQLite time', ('timer', 'rerun_db')),
+                       ('write-lock wait', ('sql', LOCK_STATEMENT))):
+        histogram = merge(states, key)
+        print(f'{label:24}{histogram.count:8d}' + ''.join(
+            f'{histogram.quantile(q) * 1e3:10.1f}' for q in (0.5, 0.9, 0.99)))
+    lock = merge(states, ('sql', LOCK_STATEMENT))
+    print(f'write-lock wait total {lock.total * 1e3:.0f} ms, SQLite errors: {errors}')
+    if failed or games != sessions * args.games:
+        print(f'FAILED: worker exit codes {failed}, expected {sessions * args.games} games')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Multi-process stress check: no player_stats increments are lost.
+
+Spawns one process per session, releases them together through a barrier and
+has each save several finished games, some sessions sharing a player id.
+Exits non-zero if any total disagrees with what was written.
+
+Usage: python benchmarks/stress_concurrent_saves.py [--sessions 64] [--games 20]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import stats
+
+
+def play_session(db_path: str, session: int, games: int, players: int, barrier):
+    database.DB_PATH = db_path
+    database.init_database()
+    player_id = f'player-{session % players}'
+    barrier.wait()
+    for game in range(games):
+        won = (session + game) % 2 == 0
+        stats.save_game_stats(5 * (game % 6), 10, 'easy', 'Player' if won else 'AI', 30, player_id=player_id)
+
+
+def expected_totals(sessions: int, games: int, players: int):
+    totals = {}
+    for session in range(sessions):
+        player_id = f'player-{session % players}'
+        row = totals.setdefault(player_id, [0, 0, 0])
+        for game in range(games):
+            row[0] += 1
+            row[1] += 1 if (session + game) % 2 == 0 else 0
+            row[2] += 5 * (game % 6)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=64)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--players', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'stress.db')
+        database.init_database(db_path)
+        database.get_pool(db_path).close()
+
+        ctx = mp.get_context('spawn')
+        barrier = ctx.Barrier(args.sessions)
+        procs = [
+            ctx.Process(target=play_session, args=(db_path, i, args.games, args.players, barrier))
+            for i in range(args.sessions)
+        ]
+        for proc in procs:
+            proc.start()
+        start = time.perf_counter()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+        failed = [proc.exitcode for proc in procs if proc.exitcode != 0]
+
+        with database.connection(db_path) as conn:
+            rows = {
+                row[0]: list(row[1:])
+                for row in conn.execute('SELECT player_id, total_games, total_wins, total_score FROM player_stats')
+            }
+            game_rows = conn.execute('SELECT COUNT(*) FROM game_stats').fetchone()[0]
+
+    expected = expected_totals(args.sessions, args.games, args.players)
+    total_games = args.sessions * args.games
+    print(f'{args.sessions} sessions x {args.games} games in {elapsed:.2f}s '
+          f'({total_games / elapsed:.0f} saves/s)')
+    print(f'game_stats rows: {game_rows} / {total_games}')
+    ok = not failed and rows == expected and game_rows == total_games
+    if not ok:
+        print(f'MISMATCH: failed workers={failed}\n expected={expected}\n actual={rows}')
+        sys.exit(1)
+    print('OK: no lost increments')
+
+
+if __name__ == '__main__':
+    main()
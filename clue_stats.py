@@ -0,0 +1,193 @@
+"""Online per-clue difficulty statistics.
+
+Every player attempt is folded into a per-clue accumulator in memory
+(attempts, solves and a Welford mean/M2 of seconds to answer). A daemon
+thread merges the accumulated batch into the clue_stats table every
+FLUSH_INTERVAL seconds with one executemany upsert; the merge uses the
+parallel form of Welford's update, so stored rows are never recomputed
+from raw history and no per-attempt rows exist.
+
+Readers get ClueEstimates from an in-memory snapshot per puzzle, reloaded
+from the table after SNAPSHOT_TTL seconds. Solve rates are smoothed
+towards PRIOR_SOLVE_RATE so a clue with a handful of attempts stays close
+to average.
+
+Nothing is recorded until start_recording() is called, which the app does
+unless CROSSWORD_CLUE_STATS=0.
+"""
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+from database import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+CLUE_STATS_ENABLED = os.environ.get('CROSSWORD_CLUE_STATS', '1') == '1'
+FLUSH_INTERVAL = 5.0
+SNAPSHOT_TTL = float(os.environ.get('CROSSWORD_CLUE_STATS_TTL', '60'))
+SNAPSHOT_SIZE = 1024
+PRIOR_SOLVE_RATE = 0.5
+PRIOR_WEIGHT = 10
+
+# Merge a batch (attempts, solves, n, mean, m2) into the stored row:
+# Chan et al.'s pairwise combination of two Welford accumulators.
+UPSERT_CLUE_STATS = '''
+    INSERT INTO clue_stats (puzzle_id, clue_id, attempts, solves, time_count, time_mean, time_m2)
+    VALUES (:puzzle_id, :clue_id, :attempts, :solves, :count, :mean, :m2)
+    ON CONFLICT (puzzle_id, clue_id) DO UPDATE SET
+        attempts = attempts + excluded.attempts,
+        solves = solves + excluded.solves,
+        time_mean = time_mean + (excluded.time_mean - time_mean) * excluded.time_count
+                    / (time_count + excluded.time_count),
+        time_m2 = time_m2 + excluded.time_m2 + (excluded.time_mean - time_mean) * (excluded.time_mean - time_mean)
+                  * time_count * excluded.time_count / (time_count + excluded.time_count),
+        time_count = time_count + excluded.time_count
+'''
+
+ClueKey = Tuple[str, int]
+
+
+class ClueAccumulator:
+    """Attempts, solves and a Welford accumulator of answer times"""
+
+    __slots__ = ('attempts', 'solves', 'count', 'mean', 'm2')
+
+    def __init__(self):
+        self.attempts = 0
+        self.solves = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, solved: bool, seconds: float):
+        self.attempts += 1
+        self.solves += solved
+        self.count += 1
+        delta = seconds - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (seconds - self.mean)
+
+
+class ClueEstimate(NamedTuple):
+    attempts: int
+    solve_rate: float
+    mean_seconds: float
+    stdev_seconds: float
+
+    @property
+    def logit_shift(self) -> float:
+        """How much easier than an average clue this one is, in log-odds"""
+        rate = min(max(self.solve_rate, 0.01), 0.99)
+        return math.log(rate / (1 - rate)) - math.log(PRIOR_SOLVE_RATE / (1 - PRIOR_SOLVE_RATE))
+
+    def points(self, base: int) -> int:
+        """Clue value scaled by difficulty: up to twice `base` for hard clues, at least 1"""
+        return max(1, min(2 * base, round(base * (1 - self.logit_shift / 4))))
+
+
+def estimate(attempts: int, solves: int, count: int, mean: float, m2: float) -> ClueEstimate:
+    rate = (solves + PRIOR_SOLVE_RATE * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT)
+    stdev = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+    return ClueEstimate(attempts, rate, mean, stdev)
+
+
+class ClueStatsRecorder:
+    """Collects attempts in memory and merges them into SQLite in batches"""
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._pending: Dict[ClueKey, ClueAccumulator] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='clue-stats', daemon=True)
+        self._thread.start()
+
+    def record(self, puzzle_id: Union[int, str], clue_id: int, solved: bool, seconds: float):
+        key = (str(puzzle_id), clue_id)
+        with self._lock:
+            accumulator = self._pending.get(key)
+            if accumulator is None:
+                accumulator = self._pending[key] = ClueAccumulator()
+            accumulator.add(solved, seconds)
+
+    def flush(self) -> int:
+        """Write everything recorded so far; returns the number of clues updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        params = [
+            {'puzzle_id': puzzle_id, 'clue_id': clue_id, 'attempts': a.attempts, 'solves': a.solves,
+             'count': a.count, 'mean': a.mean, 'm2': a.m2}
+            for (puzzle_id, clue_id), a in pending.items()
+        ]
+        with transaction(self.db_path) as conn:
+            conn.executemany(UPSERT_CLUE_STATS, params)
+        return len(params)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing clue statistics failed')
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+        self.flush()
+
+
+_recorder: Optional[ClueStatsRecorder] = None
+_recorder_lock = threading.Lock()
+
+# puzzle id -> (expires, {clue_id: ClueEstimate})
+_snapshots: 'OrderedDict[str, Tuple[float, Dict[int, ClueEstimate]]]' = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def start_recording() -> Optional[ClueStatsRecorder]:
+    """Start the process-wide recorder unless CROSSWORD_CLUE_STATS=0; safe to call on every rerun"""
+    global _recorder
+    if not CLUE_STATS_ENABLED:
+        return None
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = ClueStatsRecorder()
+                atexit.register(_recorder.close)
+    return _recorder
+
+
+def get_recorder() -> Optional[ClueStatsRecorder]:
+    return _recorder
+
+
+def estimates(puzzle_id: Union[int, str]) -> Dict[int, ClueEstimate]:
+    """Cached estimates for a puzzle's clues, keyed by clue id; clues never attempted are absent"""
+    key = str(puzzle_id)
+    now = time.monotonic()
+    with _snapshots_lock:
+        cached = _snapshots.get(key)
+        if cached is not None and now < cached[0]:
+            _snapshots.move_to_end(key)
+            return cached[1]
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT clue_id, attempts, solves, time_count, time_mean, time_m2
+            FROM clue_stats WHERE puzzle_id = ?
+        ''', (key,)).fetchall()
+    snapshot = {row[0]: estimate(*row[1:]) for row in rows}
+    with _snapshots_lock:
+        _snapshots[key] = (now + SNAPSHOT_TTL, snapshot)
+        _snapshots.move_to_end(key)
+        if len(_snapshots) > SNAPSHOT_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
@@ -0,0 +1,276 @@
+import math
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from fuzzy import FuzzyIndex
+
+class CrosswordData:
+    """Crossword puzzle data and management"""
+    
+    PUZZLES = {
+        'easy': {
+            'grid_size': (8, 8),
+            'clues': [
+                {'id': 1, 'clue': 'Domestic animal that barks', 'answer': 'DOG', 'row': 0, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 2, 'clue': 'Feline pet', 'answer': 'CAT', 'row': 2, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 3, 'clue': 'Color of the sky', 'answer': 'BLUE', 'row': 4, 'col': 1, 'direction': 'across', 'points': 5},
+                {'id': 4, 'clue': 'Opposite of hot', 'answer': 'COLD', 'row': 0, 'col': 5, 'direction': 'down', 'points': 5},
+                {'id': 5, 'clue': 'Large body of water', 'answer': 'SEA', 'row': 6, 'col': 2, 'direction': 'across', 'points': 5},
+            ]
+        },
+        'medium': {
+            'grid_size': (10, 10),
+            'clues': [
+                {'id': 1, 'clue': 'Capital of France', 'answer': 'PARIS', 'row': 0, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 2, 'clue': 'Largest planet in our solar system', 'answer': 'JUPITER', 'row': 2, 'col': 1, 'direction': 'across', 'points': 5},
+                {'id': 3, 'clue': 'Programming language named after a snake', 'answer': 'PYTHON', 'row': 4, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 4, 'clue': 'Chemical symbol for gold', 'answer': 'AU', 'row': 6, 'col': 3, 'direction': 'down', 'points': 5},
+                {'id': 5, 'clue': 'Author of Romeo and Juliet', 'answer': 'SHAKESPEARE', 'row': 7, 'col': 0, 'direction': 'across', 'points': 5},
+            ]
+        },
+        'hard': {
+            'grid_size': (12, 12),
+            'clues': [
+                {'id': 1, 'clue': 'Study of the fundamental nature of reality', 'answer': 'METAPHYSICS', 'row': 0, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 2, 'clue': 'Mathematical constant approximately 3.14159', 'answer': 'PI', 'row': 2, 'col': 5, 'direction': 'down', 'points': 5},
+                {'id': 3, 'clue': 'Process by which plants make food', 'answer': 'PHOTOSYNTHESIS', 'row': 4, 'col': 0, 'direction': 'across', 'points': 5},
+                {'id': 4, 'clue': 'Ancient Greek philosopher taught by Plato', 'answer': 'ARISTOTLE', 'row': 6, 'col': 2, 'direction': 'across', 'points': 5},
+                {'id': 5, 'clue': 'Quantum physics principle about uncertainty', 'answer': 'HEISENBERG', 'row': 8, 'col': 1, 'direction': 'across', 'points': 5},
+            ]
+        }
+    }
+    
+    @classmethod
+    def get_puzzle(cls, difficulty: str) -> Dict:
+        """Random puzzle from the on-disk bank, falling back to the built-in set"""
+        from puzzle_bank import get_bank
+        bank = get_bank()
+        if bank is not None:
+            puzzle = bank.random_puzzle(difficulty)
+            if puzzle is not None:
+                return puzzle
+        return cls.PUZZLES.get(difficulty, cls.PUZZLES['easy'])
+
+    @classmethod
+    def puzzle_id(cls, puzzle: Dict, difficulty: str) -> Union[int, str]:
+        """Id to look a puzzle up again: the bank row id, or the built-in puzzle's difficulty"""
+        if 'puzzle_id' in puzzle:
+            return puzzle['puzzle_id']
+        return difficulty if difficulty in cls.PUZZLES else 'easy'
+
+    @classmethod
+    def get_puzzle_by_id(cls, puzzle_id: Union[int, str]) -> Dict:
+        """The shared, read-only puzzle for an id from puzzle_id()"""
+        if isinstance(puzzle_id, str):
+            return cls.PUZZLES[puzzle_id]
+        from puzzle_bank import get_bank
+        puzzle = get_bank().get_by_id(puzzle_id)
+        if puzzle is None:
+            raise KeyError(puzzle_id)
+        return puzzle
+
+    @staticmethod
+    @lru_cache(maxsize=int(os.environ.get('CROSSWORD_PUZZLE_CACHE_SIZE', '256')))
+    def get_compiled(puzzle_id: Union[int, str]) -> 'CompiledPuzzle':
+        """The shared CompiledPuzzle for an id, compiled on first use"""
+        return CompiledPuzzle(puzzle_id, CrosswordData.get_puzzle_by_id(puzzle_id))
+
+    WORD_INDEX_PATH = os.environ.get('CROSSWORD_WORD_INDEX', 'words.idx')
+
+    # grid_size and answer length range for generated puzzles
+    GENERATION = {
+        'easy': ((8, 8), 3, 5),
+        'medium': ((10, 10), 4, 7),
+        'hard': ((12, 12), 6, 11),
+    }
+
+    _word_index = None
+
+    @classmethod
+    def word_index(cls):
+        """Memory-mapped word index, or None when no index file exists"""
+        if cls._word_index is None and os.path.exists(cls.WORD_INDEX_PATH):
+            from word_index import WordIndex
+            cls._word_index = WordIndex.open(cls.WORD_INDEX_PATH)
+        return cls._word_index
+
+    @classmethod
+    def generate_puzzle(cls, difficulty: str, rng: Optional[random.Random] = None,
+                        words_per_length: int = 4) -> Optional[Dict]:
+        """Lay out a new puzzle from clued words in the word index"""
+        index = cls.word_index()
+        if index is None:
+            return None
+        from layout import generate_layout
+        rng = rng or random.Random()
+        grid_size, shortest, longest = cls.GENERATION.get(difficulty, cls.GENERATION['easy'])
+        entries = []
+        for length in range(shortest, longest + 1):
+            entries.extend(e for e in index.sample(length, words_per_length, rng) if e[1])
+        puzzle = generate_layout(entries, grid_size, rng=rng)
+        if not puzzle['clues']:
+            return None
+        return {'grid_size': puzzle['grid_size'], 'clues': puzzle['clues']}
+
+class CompiledPuzzle:
+    """A puzzle prepared once for constant-time play.
+
+    Clue ids map to positions, answers are upper-cased and stripped ahead
+    of time, and `cells` holds the solution grid row-major (0 for a blank
+    cell) with each clue's in-bounds cell offsets in `clue_cells`. Shared
+    by every game on the puzzle, so nothing here may be mutated except
+    `fuzzy`, a cache that is only ever added to: each FuzzyIndex is built
+    whole before it is stored, so a race at worst builds one twice.
+    """
+
+    __slots__ = ('puzzle_id', 'rows', 'cols', 'clues', 'answers', 'index', 'cells', 'clue_cells', 'fuzzy')
+
+    def __init__(self, puzzle_id: Union[int, str], puzzle: Dict):
+        self.puzzle_id = puzzle_id
+        self.rows, self.cols = puzzle['grid_size']
+        self.clues: Tuple[Dict, ...] = tuple(puzzle['clues'])
+        self.answers: Tuple[str, ...] = tuple(clue['answer'].upper().strip() for clue in self.clues)
+        self.index: Dict[int, int] = {}
+        for position, clue in enumerate(self.clues):
+            self.index.setdefault(clue['id'], position)  # first clue wins, as a linear scan would
+
+        cells = bytearray(self.rows * self.cols)
+        clue_cells = []
+        for clue, answer in zip(self.clues, self.answers):
+            d_row, d_col = (0, 1) if clue['direction'] == 'across' else (1, 0)
+            offsets = []
+            for step, letter in enumerate(answer.encode('ascii', 'replace')):
+                row, col = clue['row'] + d_row * step, clue['col'] + d_col * step
+                if 0 <= row < self.rows and 0 <= col < self.cols:
+                    offset = row * self.cols + col
+                    cells[offset] = letter
+                    offsets.append(offset)
+            clue_cells.append(tuple(offsets))
+        self.cells = bytes(cells)
+        self.clue_cells: Tuple[Tuple[int, ...], ...] = tuple(clue_cells)
+        # (position, max_distance) -> FuzzyIndex, built on the first tolerant check of that clue
+        self.fuzzy: Dict[Tuple[int, int], 'FuzzyIndex'] = {}
+
+    def __len__(self) -> int:
+        return len(self.clues)
+
+    def position(self, clue_id: int) -> Optional[int]:
+        """Index of the clue with this id, or None"""
+        return self.index.get(clue_id)
+
+    def check(self, position: int, answer: str) -> bool:
+        return answer.upper().strip() == self.answers[position]
+
+    def match(self, position: int, answer: str, max_distance: int) -> Optional[int]:
+        """Edit distance to the closest accepted answer within tolerance, or None.
+
+        Ignores spaces and punctuation and accepts the clue's 'alternates'.
+        """
+        if self.check(position, answer):
+            return 0
+        found = self.fuzzy_index(position, max_distance).match(answer)
+        return None if found is None else found[1]
+
+    def fuzzy_index(self, position: int, max_distance: int) -> 'FuzzyIndex':
+        index = self.fuzzy.get((position, max_distance))
+        if index is None:
+            from fuzzy import FuzzyIndex, accepted_answers
+            index = FuzzyIndex(accepted_answers(self.clues[position]), max_distance)
+            self.fuzzy[position, max_distance] = index
+        return index
+
+
+# Shared by every AIPlayer without estimates; never modified
+_NO_ESTIMATES: Dict = {}
+
+
+class AIPlayer:
+    """AI opponent with difficulty-based behavior"""
+
+    # Difficulty profiles, shared by every instance
+    accuracy_rates = {
+        'easy': 0.7,
+        'medium': 0.85,
+        'hard': 0.95
+    }
+    thinking_times = {
+        'easy': (2, 4),
+        'medium': (3, 6),
+        'hard': (4, 8)
+    }
+
+    __slots__ = ('difficulty', 'rng', 'estimates')
+
+    def __init__(self, difficulty: str = 'medium', rng: Optional[random.Random] = None,
+                 estimates: Optional[Dict] = None):
+        self.difficulty = difficulty
+        self.rng = rng or random.Random()
+        # clue id -> clue_stats.ClueEstimate from real players, when available
+        self.estimates = estimates or _NO_ESTIMATES
+    
+    def clue_points(self, clue: Dict) -> int:
+        """A clue's points, scaled by how often players solve it when that is known"""
+        estimate = self.estimates.get(clue['id'])
+        return clue['points'] if estimate is None else estimate.points(clue['points'])
+
+    def select_clue(self, available_clues: List[Dict]) -> Optional[Dict]:
+        """Select a clue based on AI difficulty"""
+        if not available_clues:
+            return None
+        
+        if self.difficulty == 'easy':
+            # Prefer clues players find easiest (unseen clues count as
+            # average), then shorter words
+            def ease(clue):
+                estimate = self.estimates.get(clue['id'])
+                return (-(estimate.solve_rate if estimate else 0.5), len(clue['answer']))
+            return min(available_clues, key=ease)
+        elif self.difficulty == 'hard':
+            # Prefer high-point clues
+            return max(available_clues, key=self.clue_points)
+        else:
+            # Random selection for medium
+            return self.rng.choice(available_clues)
+    
+    def accuracy(self, clue: Dict) -> float:
+        """Difficulty accuracy, shifted in log-odds by how hard players find this clue"""
+        accuracy = self.accuracy_rates[self.difficulty]
+        estimate = self.estimates.get(clue['id'])
+        if estimate is None:
+            return accuracy
+        logit = math.log(accuracy / (1 - accuracy)) + estimate.logit_shift
+        return 1 / (1 + math.exp(-logit))
+
+    def attempt_answer(self, clue: Dict) -> bool:
+        """Attempt to answer a clue based on AI accuracy"""
+        return self.rng.random() < self.accuracy(clue)
+
+    def thinking_time(self, scale: float = 1.0) -> float:
+        """Seconds this move takes by the difficulty's thinking_times, scaled by `scale`"""
+        if not scale:
+            return 0.0
+        low, high = self.thinking_times[self.difficulty]
+        return self.rng.uniform(low, high) * scale
+
+    def think(self, clue: Dict, cancelled: Optional[threading.Event] = None,
+              scale: float = 0.0) -> Optional[bool]:
+        """Work out an answer; returns None if `cancelled` is set first.
+
+        Meant to run off the UI thread. A non-zero `scale` blocks for
+        thinking_time(scale) seconds, standing in for an expensive strategy
+        in benchmarks; game time is kept by GameEngine with a deadline instead.
+        """
+        if scale:
+            delay = self.thinking_time(scale)
+            if cancelled is None:
+                time.sleep(delay)
+            elif cancelled.wait(delay):
+                return None
+        if cancelled is not None and cancelled.is_set():
+            return None
+        return self.attempt_answer(clue)
@@ -0,0 +1,294 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from metrics import connection_factory
+
+DB_PATH = os.environ.get('CROSSWORD_DB_PATH', 'crossword_stats.db')
+POOL_SIZE = int(os.environ.get('CROSSWORD_DB_POOL_SIZE', '8'))
+BUSY_TIMEOUT_MS = 5000
+
+# Applied to every connection when it is opened
+PRAGMAS = (
+    'PRAGMA synchronous = NORMAL',
+    f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -8000',
+    'PRAGMA foreign_keys = ON',
+)
+
+# Ordered schema migrations, tracked through PRAGMA user_version.
+# Never edit an entry once released; append a new version instead.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
+        '''
+        CREATE TABLE IF NOT EXISTS game_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_score INTEGER,
+            ai_score INTEGER,
+            difficulty TEXT,
+            winner TEXT,
+            game_date TIMESTAMP,
+            duration_seconds INTEGER
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS player_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            total_games INTEGER DEFAULT 0,
+            total_wins INTEGER DEFAULT 0,
+            total_score INTEGER DEFAULT 0,
+            win_streak INTEGER DEFAULT 0,
+            best_streak INTEGER DEFAULT 0,
+            last_updated TIMESTAMP
+        )
+        ''',
+    ]),
+    # player_stats becomes one row per player; the legacy shared row id=1
+    # is kept as the 'local' player until a player claims it from the
+    # landing page (stats.claim_legacy_player).
+    (2, [
+        'ALTER TABLE player_stats ADD COLUMN player_id TEXT',
+        "UPDATE player_stats SET player_id = 'local' WHERE player_id IS NULL",
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_player_stats_player_id ON player_stats (player_id)',
+        'ALTER TABLE game_stats ADD COLUMN player_id TEXT',
+        "UPDATE game_stats SET player_id = 'local' WHERE player_id IS NULL",
+    ]),
+    # Per-player history reads and incremental aggregate refreshes
+    (3, [
+        'CREATE INDEX IF NOT EXISTS idx_game_stats_player_id ON game_stats (player_id, id)',
+    ]),
+    # Leaderboards, date-range history and a daily rollup kept up to date by
+    # stats.write_games() in the same transaction as each game insert.
+    (4, [
+        'CREATE INDEX IF NOT EXISTS idx_game_stats_difficulty_score ON game_stats (difficulty, player_score, id)',
+        'CREATE INDEX IF NOT EXISTS idx_game_stats_game_date ON game_stats (game_date)',
+        'CREATE INDEX IF NOT EXISTS idx_player_stats_total_wins ON player_stats (total_wins)',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            games INTEGER NOT NULL DEFAULT 0,
+            player_wins INTEGER NOT NULL DEFAULT 0,
+            ai_wins INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            total_player_score INTEGER NOT NULL DEFAULT 0,
+            total_ai_score INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            best_player_score INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, difficulty)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT OR REPLACE INTO daily_stats
+        SELECT date(game_date), difficulty, COUNT(*),
+               SUM(winner = 'Player'), SUM(winner = 'AI'), SUM(winner = 'Draw'),
+               SUM(player_score), SUM(ai_score), SUM(duration_seconds), MAX(player_score)
+        FROM game_stats
+        GROUP BY date(game_date), difficulty
+        ''',
+    ]),
+    # Per-player, per-difficulty totals of games moved out by maintenance.py,
+    # so summaries built from game_stats stay complete after archiving.
+    (5, [
+        '''
+        CREATE TABLE IF NOT EXISTS player_difficulty_archive (
+            player_id TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (player_id, difficulty)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    # Running per-clue statistics merged in batches by clue_stats.py
+    (6, [
+        '''
+        CREATE TABLE IF NOT EXISTS clue_stats (
+            puzzle_id TEXT NOT NULL,
+            clue_id INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            solves INTEGER NOT NULL DEFAULT 0,
+            time_count INTEGER NOT NULL DEFAULT 0,
+            time_mean REAL NOT NULL DEFAULT 0,
+            time_m2 REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (puzzle_id, clue_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections for one database file"""
+
+    def __init__(self, path: str = DB_PATH, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.pid = os.getpid()
+        self._idle: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly by transaction()
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            factory=connection_factory(),
+        )
+        conn.execute('PRAGMA journal_mode = WAL')
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow an idle connection, opening a new one while under the pool size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back any open transaction"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def discard(self, conn: sqlite3.Connection):
+        """Close a broken connection instead of returning it to the pool"""
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._opened -= 1
+
+    def close(self):
+        """Close all idle connections; borrowed ones are closed on release"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_initialized: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+_init_lock = threading.Lock()
+
+
+def get_pool(path: Optional[str] = None) -> ConnectionPool:
+    """Return the process-wide pool for a database, recreating it after fork"""
+    path = path or DB_PATH
+    pool = _pools.get(path)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _registry_lock:
+        pool = _pools.get(path)
+        if pool is None or pool.pid != os.getpid():
+            # Connections inherited from a parent process must not be reused
+            pool = ConnectionPool(path)
+            _pools[path] = pool
+        return pool
+
+
+@contextmanager
+def connection(path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for the duration of the block"""
+    pool = get_pool(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Run the block inside a write transaction, committing on success"""
+    with connection(path) as conn:
+        # IMMEDIATE takes the write lock up front so busy_timeout applies to
+        # it, instead of failing later when a read lock needs upgrading.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+@contextmanager
+def snapshot(path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Run several reads against one consistent view of the database"""
+    with connection(path) as conn:
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.commit()
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Re-read under the write lock so concurrent processes migrate once
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {target}')
+            version = target
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return version
+
+
+def init_database(path: Optional[str] = None) -> int:
+    """Initialize the schema once per process; later calls are a dict lookup"""
+    path = path or DB_PATH
+    version = _initialized.get(path)
+    if version is not None:
+        return version
+    with _init_lock:
+        version = _initialized.get(path)
+        if version is None:
+            with connection(path) as conn:
+                version = migrate(conn)
+            _initialized[path] = version
+    return version
@@ -0,0 +1,144 @@
+"""Streaming export of game_stats as CSV or JSON Lines.
+
+Rows are read in keyset-paginated pages (WHERE id > last ORDER BY id LIMIT n)
+and pulled from each page with fetchmany, so memory stays constant however
+large the table is and no read transaction is held open between pages.
+Every export reports the last id written; pass it back as --since-id (or
+use --state-file) to export only newer games next time.
+
+Usage:
+    python export.py --format jsonl --output games.jsonl
+    python export.py --format csv --state-file export.state >> games.csv
+"""
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+from database import connection
+
+COLUMNS = ('id', 'player_id', 'player_score', 'ai_score', 'difficulty', 'winner', 'game_date', 'duration_seconds')
+PAGE_SIZE = 50000
+FETCH_SIZE = 1000
+
+
+def iter_game_rows(since_id: int = 0, player_id: Optional[str] = None, page_size: int = PAGE_SIZE,
+                   fetch_size: int = FETCH_SIZE) -> Iterator[Tuple]:
+    """Yield game_stats rows with id > since_id in id order"""
+    where = 'id > ?' if player_id is None else 'player_id = ? AND id > ?'
+    sql = f'SELECT {", ".join(COLUMNS)} FROM game_stats WHERE {where} ORDER BY id LIMIT ?'
+    last_id = since_id
+    while True:
+        params = (last_id, page_size) if player_id is None else (player_id, last_id, page_size)
+        seen = 0
+        with connection() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                seen += len(rows)
+                last_id = rows[-1][0]
+                yield from rows
+        if seen < page_size:
+            return
+
+
+def iter_csv(rows: Iterator[Tuple], header: bool = True) -> Iterator[str]:
+    """Encode rows as CSV text, one chunk per FETCH_SIZE rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterator[Tuple]) -> Iterator[str]:
+    """Encode rows as JSON Lines text, one chunk per FETCH_SIZE rows"""
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(COLUMNS, row)), separators=(',', ':')))
+        if len(chunk) == FETCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def csv_file(rows: Iterator[Tuple]) -> io.RawIOBase:
+    """The rows as CSV in an unbuffered temporary file, rewound for reading"""
+    handle = tempfile.TemporaryFile(buffering=0)
+    for chunk in iter_csv(rows):
+        handle.write(chunk.encode())
+    handle.seek(0)
+    return handle
+
+
+class LastId:
+    """Pass-through iterator remembering the id of the last row seen"""
+
+    def __init__(self, rows: Iterator[Tuple], since_id: int):
+        self.rows = rows
+        self.value = since_id
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for row in self.rows:
+            self.value = row[0]
+            yield row
+
+
+def export_games(out, fmt: str = 'jsonl', since_id: int = 0, player_id: Optional[str] = None,
+                 header: bool = True) -> int:
+    """Write games newer than since_id to a text stream; returns the last id written"""
+    tracker = LastId(iter_game_rows(since_id, player_id=player_id), since_id)
+    chunks = iter_csv(iter(tracker), header=header) if fmt == 'csv' else iter_jsonl(iter(tracker))
+    for chunk in chunks:
+        out.write(chunk)
+    return tracker.value
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export game history as CSV or JSON Lines')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='jsonl')
+    parser.add_argument('--output', default='-', help='file to write, - for stdout')
+    parser.add_argument('--since-id', type=int, default=0, help='only export games with a larger id')
+    parser.add_argument('--state-file', help='read --since-id from and write the last id to this file')
+    parser.add_argument('--player-id')
+    parser.add_argument('--no-header', action='store_true', help='omit the CSV header row')
+    args = parser.parse_args(argv)
+
+    since_id = args.since_id
+    if args.state_file and os.path.exists(args.state_file):
+        with open(args.state_file) as handle:
+            since_id = int(handle.read().strip() or 0)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8', newline='')
+    try:
+        header = not args.no_header and not (args.format == 'csv' and since_id > 0)
+        last_id = export_games(out, args.format, since_id, player_id=args.player_id, header=header)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.state_file:
+        with open(args.state_file, 'w') as handle:
+            handle.write(str(last_id))
+    print(f'exported through id {last_id}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Tolerant answer matching for near-miss typos and alternate answers.
+
+Answers and guesses are compared in canonical form: upper case, letters and
+digits only, so spaces and punctuation never matter. A guess within a small
+edit distance (optimal string alignment: insertions, deletions,
+substitutions and adjacent swaps) of an accepted answer counts as a
+near miss. The distance allowed grows with answer length, so short answers
+like PI or AU are never matched by accident.
+
+Lookups go through a deletion-neighbourhood index: every accepted answer is
+stored under each string reachable by deleting up to its allowed distance
+of characters. A guess generates its own deletions and only the answers
+sharing one are verified, so a check costs the same for 5 or 50,000
+alternates. A guess whose length is further from every answer's than the
+edits allowed is rejected before any deletions are generated, so a long
+guess costs no more than its canonical form.
+"""
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+MAX_DISTANCE = 2
+
+
+def canonical(text: str) -> str:
+    """Upper-case letters and digits only"""
+    return ''.join(ch for ch in text.upper() if ch.isalnum())
+
+
+def allowed_distance(length: int, max_distance: int = MAX_DISTANCE) -> int:
+    """Edits tolerated for an answer of this length"""
+    if length < 4:
+        return 0
+    return min(max_distance, 1 if length < 8 else 2)
+
+
+def deletions(word: str, depth: int) -> Iterator[str]:
+    """`word` and every string made by deleting up to `depth` characters"""
+    seen: Set[str] = set()
+    for removed in range(min(depth, len(word)) + 1):
+        for positions in combinations(range(len(word)), removed):
+            variant = ''.join(ch for i, ch in enumerate(word) if i not in positions)
+            if variant not in seen:
+                seen.add(variant)
+                yield variant
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        best = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """Deletion-neighbourhood index over one clue's accepted answers"""
+
+    __slots__ = ('answers', 'limits', 'exact', 'variants', 'max_distance', 'min_length', 'max_length')
+
+    def __init__(self, answers: Iterable[str], max_distance: int = MAX_DISTANCE):
+        self.answers: List[str] = []
+        self.limits: List[int] = []
+        self.exact: Dict[str, int] = {}
+        self.variants: Dict[str, List[int]] = {}
+        self.max_distance = max_distance
+        for answer in answers:
+            key = canonical(answer)
+            if not key or key in self.exact:
+                continue
+            number = len(self.answers)
+            self.answers.append(key)
+            self.limits.append(allowed_distance(len(key), max_distance))
+            self.exact[key] = number
+            for variant in deletions(key, self.limits[-1]):
+                self.variants.setdefault(variant, []).append(number)
+        # Guesses outside these lengths cannot be within max_distance of any answer
+        self.min_length = min(map(len, self.answers), default=0) - max_distance
+        self.max_length = max(map(len, self.answers), default=0) + max_distance
+
+    def match(self, guess: str) -> Optional[Tuple[int, int]]:
+        """(answer number, distance) of the closest accepted answer, or None"""
+        key = canonical(guess)
+        number = self.exact.get(key)
+        if number is not None:
+            return number, 0
+        if not self.min_length <= len(key) <= self.max_length:
+            return None
+        best: Optional[Tuple[int, int]] = None
+        checked: Set[int] = set()
+        for variant in deletions(key, self.max_distance):
+            for number in self.variants.get(variant, ()):
+                if number in checked:
+                    continue
+                checked.add(number)
+                limit = self.limits[number]
+                distance = edit_distance(key, self.answers[number], limit)
+                if distance <= limit and (best is None or distance < best[1]):
+                    best = (number, distance)
+                    if distance == 1:
+                        return best
+        return best
+
+
+def accepted_answers(clue: Dict) -> Sequence[str]:
+    """The clue's answer followed by any alternates listed under 'alternates'"""
+    return [clue['answer'], *clue.get('alternates', ())]
@@ -0,0 +1,397 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Set, Tuple, Union
+
+import attempt_log
+import clue_stats
+from crossword import AIPlayer, CompiledPuzzle, CrosswordData
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+POINTS_PER_CLUE = 5
+
+# AI moves are computed on a shared pool while the player reads the clue.
+# THINKING_SCALE multiplies AIPlayer.thinking_times (0 = answer at once):
+# each move gets a ready-at deadline, and a player who submits before it
+# beats the AI ("Out of time!"). No thread sleeps out that time, so results
+# do not depend on server load; a move the pool has not finished
+# RESULT_TIMEOUT seconds after a submit past its deadline is answered inline.
+AI_WORKERS = int(os.environ.get('CROSSWORD_AI_WORKERS', '4'))
+AI_THINKING_SCALE = float(os.environ.get('CROSSWORD_AI_THINKING_SCALE', '0'))
+AI_RESULT_TIMEOUT = float(os.environ.get('CROSSWORD_AI_RESULT_TIMEOUT', '0.05'))
+
+# Accept near-miss typos (up to FUZZY_DISTANCE edits), answers differing only
+# in spaces or punctuation, and a clue's 'alternates'
+TOLERANT_ANSWERS = os.environ.get('CROSSWORD_TOLERANT_ANSWERS', '0') == '1'
+FUZZY_DISTANCE = min(2, int(os.environ.get('CROSSWORD_FUZZY_DISTANCE', '2')))
+# Longest answer a player can type; longer input is cut to this length
+MAX_ANSWER_LENGTH = 64
+
+# Score clues by how often players solve them (1 to 2 * POINTS_PER_CLUE)
+# instead of a flat POINTS_PER_CLUE; needs clue statistics to be recorded
+DYNAMIC_POINTS = os.environ.get('CROSSWORD_DYNAMIC_POINTS', '0') == '1'
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+# Ready puzzles kept per difficulty by the app's prefetcher; 0 disables it
+PREFETCH_DEPTH = int(os.environ.get('CROSSWORD_PREFETCH_DEPTH', '2'))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_ai_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool for AI moves, starting it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=AI_WORKERS, thread_name_prefix='ai-move')
+                atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+    return _executor
+
+
+class AIMove(NamedTuple):
+    """An AI answer being computed in the background for one clue"""
+    clue_id: int
+    future: 'Future[Optional[bool]]'
+    cancelled: threading.Event
+    ready_at: float  # time.monotonic() at which the AI has its answer
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()
+
+
+class GameState:
+    """Everything one game needs between attempts.
+
+    Kept small because one lives in every session: the puzzle is referenced
+    by id and shared between sessions, and clues solved by the AI
+    (solved_mask) and by the player (player_mask) are bitmasks of clue
+    positions in the compiled puzzle.
+    """
+
+    __slots__ = (
+        'difficulty',
+        'puzzle_id',
+        'player_score',
+        'ai_score',
+        'solved_mask',
+        'player_mask',
+        'attempt_count',
+        'current_clue_index',
+        'winner',
+        'saved',
+        'game_start_time',
+        'clue_started',
+        'game_key',
+        'feedback_message',
+        'feedback_type',
+    )
+
+    def __init__(self, difficulty: str, puzzle_id: Union[int, str]):
+        self.difficulty = difficulty
+        self.puzzle_id = puzzle_id
+        self.player_score = 0
+        self.ai_score = 0
+        self.solved_mask = 0
+        self.player_mask = 0
+        self.attempt_count = 0
+        self.current_clue_index = 0
+        self.winner: Optional[str] = None
+        self.saved = False
+        self.game_start_time = time.time()
+        self.clue_started = time.monotonic()
+        self.game_key = 0  # identifies the game in the attempt log; 0 when not logged
+        self.feedback_message = ""
+        self.feedback_type = ""
+
+    @property
+    def puzzle_data(self) -> Dict:
+        return CrosswordData.get_puzzle_by_id(self.puzzle_id)
+
+    @property
+    def puzzle(self) -> CompiledPuzzle:
+        return CrosswordData.get_compiled(self.puzzle_id)
+
+    def is_solved(self, clue_id: int) -> bool:
+        position = self.puzzle.position(clue_id)
+        return position is not None and bool(self.solved_mask >> position & 1)
+
+
+class PuzzlePrefetcher:
+    """Bounded per-process buffer of ready puzzles for each difficulty.
+
+    Puzzles are loaded on a background thread while players sit on the
+    landing page or winner screen, so starting a game only pops a deque.
+    When a difficulty's buffer is empty, start() loads synchronously.
+    """
+
+    def __init__(self, depth: int = PREFETCH_DEPTH):
+        self.depth = depth
+        self._ready: Dict[str, Deque[Tuple[Union[int, str], Dict]]] = {d: deque() for d in DIFFICULTIES}
+        self._filling: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='puzzle-prefetch')
+        atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+
+    def take(self, difficulty: str) -> Optional[Tuple[Union[int, str], Dict]]:
+        """Pop a ready (puzzle_id, puzzle) pair, or None if none is buffered.
+
+        Does not refill: a refill started here would compete with the click's
+        own rerun for the GIL, so the app refills from the next idle screen.
+        """
+        ready = self._ready.get(difficulty)
+        try:
+            return ready.popleft() if ready is not None else None
+        except IndexError:
+            return None
+
+    def fill(self, *difficulties: str):
+        """Top up the buffers for these difficulties (all by default) in the background"""
+        for difficulty in difficulties or DIFFICULTIES:
+            with self._lock:
+                ready = self._ready.get(difficulty)
+                if ready is None or len(ready) >= self.depth or difficulty in self._filling:
+                    continue
+                self._filling.add(difficulty)
+            self._executor.submit(self._fill, difficulty)
+
+    def _fill(self, difficulty: str):
+        ready = self._ready[difficulty]
+        try:
+            while len(ready) < self.depth:
+                puzzle = CrosswordData.get_puzzle(difficulty)
+                puzzle_id = CrosswordData.puzzle_id(puzzle, difficulty)
+                if TOLERANT_ANSWERS:
+                    # Build the near-miss indexes here rather than on the first submit
+                    compiled = CrosswordData.get_compiled(puzzle_id)
+                    for position in range(len(compiled)):
+                        compiled.fuzzy_index(position, FUZZY_DISTANCE)
+                ready.append((puzzle_id, puzzle))
+        except Exception:
+            logger.exception('Prefetching a %s puzzle failed', difficulty)
+        finally:
+            with self._lock:
+                self._filling.discard(difficulty)
+
+    def buffered(self) -> Dict[str, int]:
+        return {difficulty: len(ready) for difficulty, ready in self._ready.items()}
+
+
+_prefetcher: Optional[PuzzlePrefetcher] = None
+
+
+def prefetch_games(*difficulties: str):
+    """Have a ready game waiting for each difficulty; a no-op with CROSSWORD_PREFETCH_DEPTH=0"""
+    global _prefetcher
+    if PREFETCH_DEPTH <= 0:
+        return
+    if _prefetcher is None:
+        with _executor_lock:
+            if _prefetcher is None:
+                _prefetcher = PuzzlePrefetcher()
+    _prefetcher.fill(*difficulties)
+
+
+def judge_answer(puzzle: CompiledPuzzle, position: Optional[int], answer: str) -> Optional[int]:
+    """Edits between the answer and an accepted one (0 when exact), or None when it is wrong"""
+    if position is None:
+        return None
+    if TOLERANT_ANSWERS:
+        return puzzle.match(position, answer, FUZZY_DISTANCE)
+    return 0 if puzzle.check(position, answer) else None
+
+
+def decide_winner(scores: Dict[str, int]) -> str:
+    """check_winner() for any number of named scores: the top scorer, or "Draw" on a shared top score"""
+    best = max(scores.values())
+    leaders = [name for name, score in scores.items() if score == best]
+    return leaders[0] if len(leaders) == 1 else "Draw"
+
+
+# Engines share one generator unless a caller injects its own; a Mersenne
+# Twister state per session would be most of the session's memory.
+_shared_rng = random.Random()
+
+
+class GameEngine:
+    """Game loop for one player against the AI, independent of any UI"""
+
+    __slots__ = ('state', 'ai_player', 'rng', 'player_id', 'ai_move')
+
+    def __init__(self, rng: Optional[random.Random] = None, player_id: Optional[str] = None):
+        self.rng = rng or _shared_rng
+        self.player_id = player_id
+        self.state: Optional[GameState] = None
+        self.ai_player: Optional[AIPlayer] = None
+        self.ai_move: Optional[AIMove] = None
+
+    def start(self, difficulty: str) -> GameState:
+        """Start a new game with selected difficulty"""
+        self.cancel_ai()
+        # Only apps that called prefetch_games() hand games over from the buffer
+        ready = _prefetcher.take(difficulty) if _prefetcher is not None else None
+        if ready is None:
+            puzzle = CrosswordData.get_puzzle(difficulty)
+            ready = (CrosswordData.puzzle_id(puzzle, difficulty), puzzle)
+        self.state = GameState(difficulty, ready[0])
+        # Per-clue estimates are only read where attempts are being recorded
+        estimates = clue_stats.estimates(ready[0]) if clue_stats.get_recorder() is not None else None
+        self.ai_player = AIPlayer(difficulty, rng=self.rng, estimates=estimates)
+        log = attempt_log.get_log()
+        if log is not None:
+            self.state.game_key = attempt_log.new_game_key()
+            log.start(self.state.game_key, difficulty, ready[0])
+        return self.state
+
+    def end(self):
+        """Leave the current game and return to difficulty selection"""
+        self.cancel_ai()
+        self.state = None
+        self.ai_player = None
+
+    def prepare_ai(self):
+        """Start the AI's move on the current clue in the background; idempotent per clue"""
+        state = self.state
+        if state is None or state.winner is not None or state.attempt_count >= MAX_ATTEMPTS:
+            return
+        clue = self.current_clue()
+        move = self.ai_move
+        if move is not None:
+            if move.clue_id == clue['id']:
+                return
+            move.cancel()
+        if state.is_solved(clue['id']):
+            self.ai_move = None
+            return
+        cancelled = threading.Event()
+        ready_at = time.monotonic() + self.ai_player.thinking_time(AI_THINKING_SCALE)
+        future = get_ai_executor().submit(self.ai_player.think, clue, cancelled)
+        self.ai_move = AIMove(clue['id'], future, cancelled, ready_at)
+
+    def cancel_ai(self):
+        """Abandon any AI move still being computed"""
+        if self.ai_move is not None:
+            self.ai_move.cancel()
+            self.ai_move = None
+
+    def _ai_answer(self, clue: Dict) -> Optional[bool]:
+        """The AI's verdict on a clue: its prepared move if any, else computed inline.
+
+        None means the player submitted before the move's thinking time was up.
+        """
+        move, self.ai_move = self.ai_move, None
+        if move is None or move.clue_id != clue['id']:
+            if move is not None:
+                move.cancel()
+            return self.ai_player.attempt_answer(clue)
+        if time.monotonic() < move.ready_at:
+            move.cancel()
+            return None
+        try:
+            return move.future.result(timeout=AI_RESULT_TIMEOUT)
+        except TimeoutError:
+            # Queued behind other sessions' moves: the AI was ready in game time
+            move.cancel()
+            return self.ai_player.attempt_answer(clue)
+
+    @property
+    def active(self) -> bool:
+        return self.state is not None
+
+    def current_clue(self) -> Dict:
+        state = self.state
+        return state.puzzle.clues[state.current_clue_index]
+
+    def clue_points(self, clue: Dict) -> int:
+        """Points a clue is worth in this game"""
+        return self.ai_player.clue_points(clue) if DYNAMIC_POINTS else POINTS_PER_CLUE
+
+    def submit(self, clue_id: int, answer: str) -> bool:
+        """Process simultaneous attempt by player and AI; returns True once the game is over"""
+        state = self.state
+        puzzle = state.puzzle
+        position = puzzle.position(clue_id)
+
+        # Player's attempt
+        distance = judge_answer(puzzle, position, answer[:MAX_ANSWER_LENGTH])
+        points = self.clue_points(puzzle.clues[position]) if position is not None else 0
+        recorder = clue_stats.get_recorder()
+        if recorder is not None and position is not None:
+            now = time.monotonic()
+            recorder.record(state.puzzle_id, clue_id, distance is not None, now - state.clue_started)
+            state.clue_started = now
+        if distance is not None:
+            state.player_score += points
+            state.player_mask |= 1 << position
+            if distance:
+                state.feedback_message = f"Your answer: Close enough! ({puzzle.clues[position]['answer']})"
+            else:
+                state.feedback_message = "Your answer: Correct!"
+            state.feedback_type = "correct"
+        else:
+            state.feedback_message = "Your answer: Wrong!"
+            state.feedback_type = "incorrect"
+
+        # AI's simultaneous attempt, unless it already solved this clue
+        if position is not None and not state.solved_mask >> position & 1:
+            selected_clue = puzzle.clues[position]
+            ai_correct = self._ai_answer(selected_clue)
+            if ai_correct:
+                ai_result = attempt_log.AI_CORRECT
+                state.ai_score += points
+                state.solved_mask |= 1 << position
+                state.feedback_message += f" | AI's answer: Correct! ({selected_clue['answer']})"
+                state.feedback_type = "correct" if state.feedback_type == "correct" else "mixed"
+            else:
+                if ai_correct is None:
+                    ai_result = attempt_log.AI_TIMEOUT
+                    state.feedback_message += " | AI's answer: Out of time!"
+                else:
+                    ai_result = attempt_log.AI_WRONG
+                    state.feedback_message += " | AI's answer: Wrong! (Incorrect attempt)"
+                state.feedback_type = "incorrect" if state.feedback_type == "incorrect" else "mixed"
+        else:
+            ai_result = attempt_log.AI_SKIPPED
+            self.cancel_ai()
+
+        # Increment attempt count and move to next clue
+        state.attempt_count += 1
+        state.current_clue_index = min(state.attempt_count, len(puzzle) - 1)
+        over = self.check_winner()
+        log = attempt_log.get_log()
+        if log is not None and state.game_key:
+            log.attempt(state.game_key, clue_id, answer, distance is not None, ai_result)
+            if over:
+                log.end(state.game_key, state.winner, state.player_score, state.ai_score)
+        return over
+
+    def check_winner(self) -> bool:
+        """Check if there's a winner after 5 attempts"""
+        state = self.state
+        if state.attempt_count >= MAX_ATTEMPTS:
+            if state.player_score > state.ai_score:
+                state.winner = "Player"
+            elif state.ai_score > state.player_score:
+                state.winner = "AI"
+            else:
+                state.winner = "Draw"
+            return True
+        return False
+
+    def is_over(self) -> bool:
+        return self.state is not None and self.state.winner is not None
+
+    def attempts_left(self) -> int:
+        return max(0, MAX_ATTEMPTS - self.state.attempt_count)
+
+    def duration(self) -> int:
+        return int(time.time() - self.state.game_start_time)
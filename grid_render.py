@@ -0,0 +1,87 @@
+"""HTML rendering of the crossword grid.
+
+The grid is one HTML block per rerun. For each puzzle, a GridRenderer builds
+the markup of every cell in its unsolved state once. A render copies that
+skeleton and re-formats only the cells of solved clues and the current
+clue, then joins the parts. Finished renders are kept in one process-wide
+LRU keyed by (puzzle id, masks, active clue), so reruns that change nothing
+cost a lookup. A session only ever needs its current render, so the LRU is
+sized for concurrent sessions, not positions: at about 20 KB per 25x25
+render, the default of 512 stays near 10 MB.
+"""
+import os
+from functools import lru_cache
+from typing import List, Optional, Union
+
+from crossword import CompiledPuzzle, CrosswordData
+
+RENDER_CACHE_SIZE = int(os.environ.get('CROSSWORD_GRID_CACHE_SIZE', '512'))
+RENDERER_CACHE_SIZE = int(os.environ.get('CROSSWORD_PUZZLE_CACHE_SIZE', '256'))
+
+# CSS class for a cell revealed by the player, the AI or both
+SOLVER_CLASSES = {1: 'cw-player', 2: 'cw-ai', 3: 'cw-both'}
+
+
+class GridRenderer:
+    """Cached skeleton of one puzzle's grid, rendered per game progress"""
+
+    def __init__(self, puzzle: CompiledPuzzle):
+        self.puzzle = puzzle
+        numbers = {}
+        for clue, cells in zip(puzzle.clues, puzzle.clue_cells):
+            if cells:
+                numbers.setdefault(cells[0], clue['id'])
+        self.numbers = numbers
+        self.skeleton = tuple(self._cell(offset, '') for offset in range(len(puzzle.cells)))
+        self.header = (f'<div class="crossword-grid"><div class="cw-grid" '
+                       f'style="grid-template-columns: repeat({puzzle.cols}, 1.6rem)">')
+        self.footer = '</div></div>'
+
+    def _cell(self, offset: int, state: str, reveal: bool = False) -> str:
+        letter = self.puzzle.cells[offset]
+        if not letter:
+            return '<div class="cw-block"></div>'
+        number = self.numbers.get(offset)
+        label = f'<span class="cw-num">{number}</span>' if number is not None else ''
+        text = chr(letter) if reveal else ''
+        classes = f'cw-cell {state}' if state else 'cw-cell'
+        return f'<div class="{classes}">{label}{text}</div>'
+
+    def render(self, player_mask: int, ai_mask: int, active: Optional[int] = None) -> str:
+        puzzle = self.puzzle
+        cells: List[str] = list(self.skeleton)
+        if active is not None and not (player_mask | ai_mask) >> active & 1:
+            for offset in puzzle.clue_cells[active]:
+                cells[offset] = self._cell(offset, 'cw-active')
+        # A crossing cell can belong to clues solved by different solvers;
+        # it is marked with the union of them.
+        owners = {}
+        solved = player_mask | ai_mask
+        position = 0
+        while solved:
+            if solved & 1:
+                solver = (player_mask >> position & 1) | (ai_mask >> position & 1) << 1
+                for offset in puzzle.clue_cells[position]:
+                    owners[offset] = owners.get(offset, 0) | solver
+            solved >>= 1
+            position += 1
+        for offset, solver in owners.items():
+            cells[offset] = self._cell(offset, SOLVER_CLASSES[solver], reveal=True)
+        return ''.join((self.header, *cells, self.footer))
+
+
+@lru_cache(maxsize=RENDERER_CACHE_SIZE)
+def get_renderer(puzzle_id: Union[int, str]) -> GridRenderer:
+    """The shared renderer for a puzzle id"""
+    return GridRenderer(CrosswordData.get_compiled(puzzle_id))
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_cached(puzzle_id: Union[int, str], player_mask: int, ai_mask: int, active: Optional[int]) -> str:
+    return get_renderer(puzzle_id).render(player_mask, ai_mask, active)
+
+
+def render_grid(state) -> str:
+    """HTML for a GameState's grid: solved clues revealed, the current clue highlighted"""
+    active = None if state.winner else state.current_clue_index
+    return _render_cached(state.puzzle_id, state.player_mask, state.solved_mask, active)
@@ -0,0 +1,297 @@
+"""Crossword layout generation and validation.
+
+The grid is two flat bytearrays (letters and the directions using each
+cell), so placement checks are index arithmetic rather than nested lists.
+Words are placed most-constrained-first: each step recomputes the legal
+placements of every remaining word (only at crossings with letters already
+on the grid), places the word with the fewest options at its best-connected
+spot, and sets aside words left with none. Several seeded restarts are tried
+and the layout placing the most words wins.
+
+Usage:
+    python layout.py check                     # validate CrosswordData.PUZZLES
+    python layout.py generate words.tsv --size 12 --seed 3
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+ACROSS = 1
+DOWN = 2
+DIRECTIONS = {'across': ACROSS, 'down': DOWN}
+DIRECTION_NAMES = {ACROSS: 'across', DOWN: 'down'}
+
+DEFAULT_ATTEMPTS = 8
+
+
+class Placement(NamedTuple):
+    answer: str
+    row: int
+    col: int
+    direction: int
+    crossings: int
+
+
+class Grid:
+    """Array-backed letter grid with crossword placement rules"""
+
+    __slots__ = ('rows', 'cols', 'letters', 'dirs', 'letter_cells')
+
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.letters = bytearray(rows * cols)
+        self.dirs = bytearray(rows * cols)
+        # letter -> cells holding it, the only places a new word can cross
+        self.letter_cells: Dict[int, List[int]] = defaultdict(list)
+
+    def crossings(self, word: bytes, row: int, col: int, direction: int) -> int:
+        """Crossings made by placing word here, or -1 if the placement is illegal"""
+        rows, cols, letters, dirs = self.rows, self.cols, self.letters, self.dirs
+        length = len(word)
+        if row < 0 or col < 0:
+            return -1
+        if direction == ACROSS:
+            if col + length > cols or row >= rows:
+                return -1
+            step, side = 1, cols
+            if col > 0 and letters[row * cols + col - 1]:
+                return -1
+            if col + length < cols and letters[row * cols + col + length]:
+                return -1
+            side_ok_before = row > 0
+            side_ok_after = row < rows - 1
+        else:
+            if row + length > rows or col >= cols:
+                return -1
+            step, side = cols, 1
+            if row > 0 and letters[(row - 1) * cols + col]:
+                return -1
+            if row + length < rows and letters[(row + length) * cols + col]:
+                return -1
+            side_ok_before = col > 0
+            side_ok_after = col < cols - 1
+
+        crossed = 0
+        index = row * cols + col
+        for letter in word:
+            existing = letters[index]
+            if existing:
+                if existing != letter or dirs[index] & direction:
+                    return -1
+                crossed += 1
+            else:
+                # A new letter must not touch parallel words side by side
+                if side_ok_before and letters[index - side]:
+                    return -1
+                if side_ok_after and letters[index + side]:
+                    return -1
+            index += step
+        return crossed
+
+    def place(self, word: bytes, row: int, col: int, direction: int):
+        step = 1 if direction == ACROSS else self.cols
+        index = row * self.cols + col
+        for letter in word:
+            if not self.letters[index]:
+                self.letters[index] = letter
+                self.letter_cells[letter].append(index)
+            self.dirs[index] |= direction
+            index += step
+
+    def candidates(self, word: bytes) -> List[Tuple[int, int, int, int]]:
+        """Legal (crossings, row, col, direction) placements crossing the grid"""
+        cols = self.cols
+        found = set()
+        for offset, letter in enumerate(word):
+            for index in self.letter_cells.get(letter, ()):
+                row, col = divmod(index, cols)
+                used = self.dirs[index]
+                if not used & ACROSS:
+                    found.add((row, col - offset, ACROSS))
+                if not used & DOWN:
+                    found.add((row - offset, col, DOWN))
+        result = []
+        for row, col, direction in found:
+            crossed = self.crossings(word, row, col, direction)
+            if crossed > 0:
+                result.append((crossed, row, col, direction))
+        return result
+
+
+def normalize_answer(answer: str) -> str:
+    """Uppercase A-Z letters only, as they appear in the grid"""
+    return ''.join(ch for ch in answer.upper() if 'A' <= ch <= 'Z')
+
+
+def _layout_once(words: List[bytes], rows: int, cols: int, rng: random.Random) -> Tuple[Grid, List[Placement]]:
+    grid = Grid(rows, cols)
+    remaining = sorted(words, key=lambda w: (-len(w), rng.random()))
+    first = remaining.pop(0)
+    if len(first) <= cols:
+        row, col, direction = rows // 2, (cols - len(first)) // 2, ACROSS
+    else:
+        row, col, direction = (rows - len(first)) // 2, cols // 2, DOWN
+    grid.place(first, row, col, direction)
+    placed = [Placement(first.decode(), row, col, direction, 0)]
+
+    while remaining:
+        best_word = None
+        best_options = None
+        for word in remaining:
+            options = grid.candidates(word)
+            if not options:
+                continue
+            # Most constrained word first; ties go to the longer word
+            if best_options is None or (len(options), -len(word)) < (len(best_options), -len(best_word)):
+                best_word, best_options = word, options
+        if best_word is None:
+            break
+        top = max(option[0] for option in best_options)
+        crossed, row, col, direction = rng.choice([o for o in best_options if o[0] == top])
+        grid.place(best_word, row, col, direction)
+        placed.append(Placement(best_word.decode(), row, col, direction, crossed))
+        remaining.remove(best_word)
+    return grid, placed
+
+
+def generate_layout(entries: Sequence[Tuple[str, str]], grid_size: Tuple[int, int],
+                    rng: Optional[random.Random] = None, attempts: int = DEFAULT_ATTEMPTS,
+                    time_budget: float = 0.05, points: int = 5) -> Dict:
+    """Lay out (answer, clue) pairs on a grid and return a puzzle dict.
+
+    Words that cannot be connected to the layout are left out; the result
+    lists them under 'unplaced'.
+    """
+    rng = rng or random.Random()
+    rows, cols = grid_size
+    clue_for = {}
+    words = []
+    for answer, clue in entries:
+        normalized = normalize_answer(answer)
+        if normalized and normalized not in clue_for and len(normalized) <= max(rows, cols):
+            clue_for[normalized] = clue
+            words.append(normalized.encode('ascii'))
+
+    best: List[Placement] = []
+    if not words:
+        return {'grid_size': (rows, cols), 'clues': [], 'unplaced': [answer for answer, _ in entries]}
+    deadline = time.perf_counter() + time_budget
+    for _ in range(attempts):
+        _, placed = _layout_once(words, rows, cols, rng)
+        if (len(placed), sum(p.crossings for p in placed)) > (len(best), sum(p.crossings for p in best)):
+            best = placed
+        if len(best) == len(words) or time.perf_counter() > deadline:
+            break
+
+    best.sort(key=lambda p: (p.row, p.col, p.direction))
+    placed_answers = {p.answer for p in best}
+    return {
+        'grid_size': (rows, cols),
+        'clues': [
+            {'id': i, 'clue': clue_for[p.answer], 'answer': p.answer, 'row': p.row, 'col': p.col,
+             'direction': DIRECTION_NAMES[p.direction], 'points': points}
+            for i, p in enumerate(best, start=1)
+        ],
+        'unplaced': [answer for answer, _ in entries if normalize_answer(answer) not in placed_answers],
+    }
+
+
+def validate_puzzle(puzzle: Dict, strict: bool = False) -> List[str]:
+    """Return a list of layout problems; empty means the puzzle is valid.
+
+    Always checks bounds, letter conflicts at crossings and words overlapping
+    in the same direction. strict also requires every word to be connected
+    and forbids letters touching side by side outside a crossing.
+    """
+    rows, cols = puzzle['grid_size']
+    letters: Dict[Tuple[int, int], str] = {}
+    owners: Dict[Tuple[int, int], List[Tuple[int, int]]] = defaultdict(list)
+    errors = []
+    for clue in puzzle['clues']:
+        answer, row, col = clue['answer'], clue['row'], clue['col']
+        direction = DIRECTIONS.get(clue['direction'])
+        label = f"clue {clue['id']} ({answer})"
+        if direction is None:
+            errors.append(f"{label}: unknown direction {clue['direction']!r}")
+            continue
+        dr, dc = (0, 1) if direction == ACROSS else (1, 0)
+        end_row, end_col = row + dr * (len(answer) - 1), col + dc * (len(answer) - 1)
+        if row < 0 or col < 0 or end_row >= rows or end_col >= cols:
+            errors.append(f'{label}: runs from ({row}, {col}) to ({end_row}, {end_col}), outside the {rows}x{cols} grid')
+        for i, letter in enumerate(answer):
+            cell = (row + dr * i, col + dc * i)
+            if not (0 <= cell[0] < rows and 0 <= cell[1] < cols):
+                continue
+            for other_id, other_direction in owners[cell]:
+                if other_direction == direction:
+                    errors.append(f'{label}: overlaps clue {other_id} in the same direction at {cell}')
+                elif letters[cell] != letter:
+                    errors.append(f'{label}: has {letter!r} at {cell} where clue {other_id} has {letters[cell]!r}')
+            letters[cell] = letter
+            owners[cell].append((clue['id'], direction))
+
+    if strict and not errors and letters:
+        for (row, col), cell_owners in owners.items():
+            directions = {d for _, d in cell_owners}
+            if ACROSS not in directions and ((row, col - 1) in letters or (row, col + 1) in letters):
+                errors.append(f'cell ({row}, {col}) touches a letter across without forming a clue')
+            if DOWN not in directions and ((row - 1, col) in letters or (row + 1, col) in letters):
+                errors.append(f'cell ({row}, {col}) touches a letter down without forming a clue')
+        start = next(iter(letters))
+        seen = {start}
+        stack = [start]
+        while stack:
+            row, col = stack.pop()
+            for cell in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if cell in letters and cell not in seen:
+                    seen.add(cell)
+                    stack.append(cell)
+        if len(seen) != len(letters):
+            errors.append('clues do not form one connected crossword')
+    return errors
+
+
+def read_entries(path: str) -> List[Tuple[str, str]]:
+    """Read ANSWER<TAB>clue lines; a bare answer doubles as its own clue"""
+    entries = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.rstrip('\n')
+            if line.strip():
+                answer, _, clue = line.partition('\t')
+                entries.append((answer.strip(), clue.strip() or answer.strip()))
+    return entries
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Generate and validate crossword layouts')
+    commands = parser.add_subparsers(dest='command', required=True)
+    check = commands.add_parser('check', help='validate the built-in puzzles')
+    check.add_argument('--strict', action='store_true')
+    generate = commands.add_parser('generate', help='lay out words from an ANSWER<TAB>clue file')
+    generate.add_argument('file')
+    generate.add_argument('--size', type=int, default=12)
+    generate.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'check':
+        from crossword import CrosswordData
+        failed = False
+        for difficulty, puzzle in CrosswordData.PUZZLES.items():
+            errors = validate_puzzle(puzzle, strict=args.strict)
+            failed = failed or bool(errors)
+            print(f'{difficulty}: {"ok" if not errors else "INVALID"}')
+            for error in errors:
+                print(f'  - {error}')
+        raise SystemExit(1 if failed else 0)
+
+    puzzle = generate_layout(read_entries(args.file), (args.size, args.size), rng=random.Random(args.seed))
+    print(json.dumps(puzzle, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Leaderboard, game history and daily report queries.
+
+Every query is answered from an index or the daily_stats rollup, so its cost
+depends on the number of rows returned, not on the size of game_stats. The
+app reads them through cached(), which keeps results like the statistics
+cache in stats.py: until a game is saved in this process, or for
+STATS_CACHE_TTL seconds.
+
+Player ids are bearer credentials (they are the ?player= URL parameter), so
+rows name players by player_tag(), a short one-way hash, never the raw id.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import connection
+from stats import STATS_CACHE_SIZE, STATS_CACHE_TTL, stats_version
+
+GAME_COLUMNS = 'player_id, difficulty, player_score, ai_score, winner, game_date, duration_seconds'
+
+
+def player_tag(player_id: str) -> str:
+    """Public name for a player: stable, but useless for playing as them"""
+    return hashlib.sha256(player_id.encode()).hexdigest()[:8]
+
+
+def _game(row) -> Dict:
+    return {
+        'player': player_tag(row[0]), 'difficulty': row[1], 'player_score': row[2], 'ai_score': row[3],
+        'winner': row[4], 'game_date': row[5], 'duration_seconds': row[6],
+    }
+
+
+def top_scores(difficulty: str, limit: int = 10) -> List[Dict]:
+    """Highest player scores for a difficulty, newest first among ties"""
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT player_id, player_score, ai_score, winner, game_date
+            FROM game_stats INDEXED BY idx_game_stats_difficulty_score
+            WHERE difficulty = ?
+            ORDER BY player_score DESC, id DESC
+            LIMIT ?
+        ''', (difficulty, limit)).fetchall()
+    return [
+        {'player': player_tag(r[0]), 'player_score': r[1], 'ai_score': r[2], 'winner': r[3], 'game_date': r[4]}
+        for r in rows
+    ]
+
+
+def top_players(limit: int = 10) -> List[Dict]:
+    """Players with the most wins"""
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT player_id, total_wins, total_games, best_streak
+            FROM player_stats INDEXED BY idx_player_stats_total_wins
+            ORDER BY total_wins DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+    return [
+        {'player': player_tag(r[0]), 'total_wins': r[1], 'total_games': r[2], 'best_streak': r[3]}
+        for r in rows
+    ]
+
+
+def recent_games(player_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    """Most recent games, for one player or everyone"""
+    with connection() as conn:
+        if player_id is None:
+            rows = conn.execute(f'''
+                SELECT {GAME_COLUMNS} FROM game_stats ORDER BY id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        else:
+            rows = conn.execute(f'''
+                SELECT {GAME_COLUMNS} FROM game_stats INDEXED BY idx_game_stats_player_id
+                WHERE player_id = ? ORDER BY id DESC LIMIT ?
+            ''', (player_id, limit)).fetchall()
+    return [_game(r) for r in rows]
+
+
+def games_between(start: str, end: str, limit: int = 100) -> List[Dict]:
+    """Games played in [start, end), using the game_date index"""
+    with connection() as conn:
+        rows = conn.execute(f'''
+            SELECT {GAME_COLUMNS} FROM game_stats INDEXED BY idx_game_stats_game_date
+            WHERE game_date >= ? AND game_date < ?
+            ORDER BY game_date
+            LIMIT ?
+        ''', (start, end, limit)).fetchall()
+    return [_game(r) for r in rows]
+
+
+def daily_summary(days: int = 30, difficulty: Optional[str] = None) -> List[Dict]:
+    """Per-day totals from the daily_stats rollup, oldest day first"""
+    since = (date.today() - timedelta(days=days - 1)).isoformat()
+    with connection() as conn:
+        if difficulty is None:
+            rows = conn.execute('''
+                SELECT day, SUM(games), SUM(player_wins), SUM(ai_wins), SUM(draws),
+                       SUM(total_player_score), SUM(total_duration), MAX(best_player_score)
+                FROM daily_stats WHERE day >= ?
+                GROUP BY day ORDER BY day
+            ''', (since,)).fetchall()
+        else:
+            rows = conn.execute('''
+                SELECT day, games, player_wins, ai_wins, draws,
+                       total_player_score, total_duration, best_player_score
+                FROM daily_stats WHERE day >= ? AND difficulty = ?
+                ORDER BY day
+            ''', (since, difficulty)).fetchall()
+    return [
+        {'day': r[0], 'games': r[1], 'player_wins': r[2], 'ai_wins': r[3], 'draws': r[4],
+         'average_score': r[5] / r[1] if r[1] else 0.0,
+         'average_duration': r[6] / r[1] if r[1] else 0.0,
+         'best_player_score': r[7]}
+        for r in rows
+    ]
+
+
+_cache: 'OrderedDict[Tuple, Tuple[int, float, List[Dict]]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def cached(query: Callable[..., List[Dict]], *args) -> List[Dict]:
+    """query(*args), reused until a game is saved in this process or STATS_CACHE_TTL passes"""
+    key = (query.__name__, *args)
+    now = time.monotonic()
+    with _cache_lock:
+        version = stats_version()
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version and now < entry[1]:
+            _cache.move_to_end(key)
+            return entry[2]
+    rows = query(*args)
+    with _cache_lock:
+        _cache[key] = (version, now + STATS_CACHE_TTL, rows)
+        _cache.move_to_end(key)
+        if len(_cache) > STATS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rows
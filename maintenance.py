@@ -0,0 +1,263 @@
+"""Retention, archiving and compaction for the statistics database.
+
+Games older than CROSSWORD_RETENTION_DAYS are moved out of game_stats into
+gzip-compressed JSON Lines files under CROSSWORD_ARCHIVE_DIR, one file per
+month. player_stats and daily_stats are running totals and are never
+touched, and per-difficulty totals of archived games are kept in
+player_difficulty_archive, so every summary stays correct. Leaderboards and
+history only cover games still in game_stats.
+
+The game path is never blocked for long:
+- Rows are read and archived outside any write transaction.
+- Each batch is deleted in its own short BEGIN IMMEDIATE transaction
+  (BATCH_SIZE rows, a few ms), with a pause between batches so queued
+  saves get the write lock.
+- Free pages are returned with PRAGMA incremental_vacuum in small steps,
+  and the WAL is checkpointed with PASSIVE, which never waits on readers.
+
+Archiving is at-least-once: a crash between writing an archive file and
+committing the delete can leave a game in the archive twice. Archived
+lines carry the game id, so duplicates are easy to drop when reading.
+
+incremental_vacuum only works once auto_vacuum is INCREMENTAL, which needs
+one full VACUUM. Run `python maintenance.py enable-vacuum` while the app is
+stopped; until then the vacuum step is skipped.
+
+Usage:
+    python maintenance.py run [--days 365] [--archive-dir archive]
+    python maintenance.py enable-vacuum
+    CROSSWORD_MAINTENANCE=1 streamlit run streamlit_app.py
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from database import connection, init_database, transaction
+from export import COLUMNS
+from stats import invalidate_stats_cache
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.environ.get('CROSSWORD_RETENTION_DAYS', '365'))
+ARCHIVE_DIR = os.environ.get('CROSSWORD_ARCHIVE_DIR', 'archive')
+# Start the background scheduler from the app, every INTERVAL seconds
+MAINTENANCE_ENABLED = os.environ.get('CROSSWORD_MAINTENANCE', '0') == '1'
+MAINTENANCE_INTERVAL = float(os.environ.get('CROSSWORD_MAINTENANCE_INTERVAL', '3600'))
+BATCH_SIZE = 100
+BATCH_PAUSE = 0.02
+VACUUM_STEP_PAGES = 256
+
+UPSERT_ARCHIVE_TOTALS = '''
+    INSERT INTO player_difficulty_archive (player_id, difficulty, games, wins, total_duration)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (player_id, difficulty) DO UPDATE SET
+        games = games + excluded.games,
+        wins = wins + excluded.wins,
+        total_duration = total_duration + excluded.total_duration
+'''
+
+
+class MaintenanceReport(NamedTuple):
+    archived: int
+    batches: int
+    max_lock_ms: float
+    vacuumed_pages: int
+    checkpoint: Optional[Tuple[int, int, int]]
+
+    def format(self) -> str:
+        return (f'archived {self.archived} games in {self.batches} batches '
+                f'(longest write lock {self.max_lock_ms:.1f} ms), '
+                f'vacuumed {self.vacuumed_pages} pages, checkpoint {self.checkpoint}')
+
+
+def archive_path(archive_dir: str, game_date: str) -> str:
+    return os.path.join(archive_dir, f'game_stats-{game_date[:7]}.jsonl.gz')
+
+
+def write_archive(rows: List[Tuple], archive_dir: str = ARCHIVE_DIR):
+    """Append rows to the monthly archive files and fsync them"""
+    import gzip
+
+    by_month: Dict[str, List[Tuple]] = defaultdict(list)
+    for row in rows:
+        by_month[archive_path(archive_dir, str(row[6]))].append(row)
+    os.makedirs(archive_dir, exist_ok=True)
+    for path, month_rows in by_month.items():
+        lines = ''.join(json.dumps(dict(zip(COLUMNS, row)), separators=(',', ':')) + '\n'
+                        for row in month_rows)
+        # Each append is a separate gzip member; readers see one stream
+        with open(path, 'ab') as handle:
+            handle.write(gzip.compress(lines.encode('utf-8')))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+def archive_batch(cutoff: str, archive_dir: str = ARCHIVE_DIR, batch_size: int = BATCH_SIZE,
+                  db_path: Optional[str] = None) -> Tuple[int, float]:
+    """Archive and delete up to batch_size games older than cutoff; returns (count, lock ms)"""
+    with connection(db_path) as conn:
+        rows = conn.execute(f'''
+            SELECT {", ".join(COLUMNS)} FROM game_stats INDEXED BY idx_game_stats_game_date
+            WHERE game_date < ? ORDER BY game_date LIMIT ?
+        ''', (cutoff, batch_size)).fetchall()
+    if not rows:
+        return 0, 0.0
+    write_archive(rows, archive_dir)
+
+    ids = [row[0] for row in rows]
+    placeholders = ', '.join('?' * len(ids))
+    started = time.perf_counter()
+    with transaction(db_path) as conn:
+        # Re-read under the write lock: another process may have archived
+        # some of these already, and they must not be counted twice.
+        present = conn.execute(f'''
+            SELECT player_id, difficulty, winner, duration_seconds
+            FROM game_stats WHERE id IN ({placeholders})
+        ''', ids).fetchall()
+        totals: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0, 0])
+        for player_id, difficulty, winner, duration in present:
+            entry = totals[player_id, difficulty]
+            entry[0] += 1
+            entry[1] += winner == 'Player'
+            entry[2] += duration or 0
+        conn.executemany(UPSERT_ARCHIVE_TOTALS, [key + tuple(value) for key, value in totals.items()])
+        conn.execute(f'DELETE FROM game_stats WHERE id IN ({placeholders})', ids)
+    if present:
+        # Summaries cached in this process re-read the archive totals
+        invalidate_stats_cache()
+    return len(present), (time.perf_counter() - started) * 1000
+
+
+def archive_old_games(days: int = RETENTION_DAYS, archive_dir: str = ARCHIVE_DIR,
+                      batch_size: int = BATCH_SIZE, pause: float = BATCH_PAUSE,
+                      db_path: Optional[str] = None,
+                      stop: Optional[threading.Event] = None) -> Tuple[int, int, float]:
+    """Archive every game older than `days`; returns (games, batches, longest lock ms)"""
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat(sep=' ')
+    archived = batches = 0
+    max_lock_ms = 0.0
+    while stop is None or not stop.is_set():
+        count, lock_ms = archive_batch(cutoff, archive_dir, batch_size, db_path)
+        if not count and not lock_ms:
+            break
+        archived += count
+        batches += 1
+        max_lock_ms = max(max_lock_ms, lock_ms)
+        time.sleep(pause)
+    return archived, batches, max_lock_ms
+
+
+def incremental_vacuum(max_pages: Optional[int] = None, step: int = VACUUM_STEP_PAGES,
+                       pause: float = BATCH_PAUSE, db_path: Optional[str] = None) -> int:
+    """Return free pages to the filesystem a step at a time; a no-op unless auto_vacuum is INCREMENTAL"""
+    vacuumed = 0
+    with connection(db_path) as conn:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            return 0
+        while max_pages is None or vacuumed < max_pages:
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free:
+                break
+            pages = min(step, free) if max_pages is None else min(step, free, max_pages - vacuumed)
+            conn.execute(f'PRAGMA incremental_vacuum({pages})').fetchall()
+            vacuumed += pages
+            time.sleep(pause)
+    return vacuumed
+
+
+def checkpoint(db_path: Optional[str] = None) -> Tuple[int, int, int]:
+    """Copy WAL frames back into the database without waiting on readers or writers"""
+    with connection(db_path) as conn:
+        return tuple(conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone())
+
+
+def enable_incremental_vacuum(db_path: Optional[str] = None):
+    """Switch the database to auto_vacuum=INCREMENTAL; rewrites the whole file, so run it offline"""
+    with connection(db_path) as conn:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+
+
+def run_maintenance(days: int = RETENTION_DAYS, archive_dir: str = ARCHIVE_DIR,
+                    db_path: Optional[str] = None,
+                    stop: Optional[threading.Event] = None) -> MaintenanceReport:
+    """One full pass: archive old games, vacuum freed pages, checkpoint the WAL"""
+    init_database(db_path)
+    archived, batches, max_lock_ms = archive_old_games(days, archive_dir, db_path=db_path, stop=stop)
+    vacuumed = incremental_vacuum(db_path=db_path)
+    return MaintenanceReport(archived, batches, max_lock_ms, vacuumed, checkpoint(db_path))
+
+
+class MaintenanceScheduler:
+    """Daemon thread running run_maintenance() every `interval` seconds"""
+
+    def __init__(self, interval: float = MAINTENANCE_INTERVAL, days: int = RETENTION_DAYS,
+                 archive_dir: str = ARCHIVE_DIR, db_path: Optional[str] = None):
+        self.interval = interval
+        self.days = days
+        self.archive_dir = archive_dir
+        self.db_path = db_path
+        self.last_report: Optional[MaintenanceReport] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stats-maintenance', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_report = run_maintenance(self.days, self.archive_dir, self.db_path, stop=self._stop)
+                logger.info('Maintenance: %s', self.last_report.format())
+            except Exception:
+                logger.exception('Maintenance pass failed')
+
+    def close(self, timeout: float = 5.0):
+        """Stop after the current batch"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler() -> Optional[MaintenanceScheduler]:
+    """Start the process-wide scheduler when CROSSWORD_MAINTENANCE=1; safe to call on every rerun"""
+    global _scheduler
+    if not MAINTENANCE_ENABLED:
+        return None
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = MaintenanceScheduler()
+                atexit.register(_scheduler.close)
+    return _scheduler
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Archive old games and compact the statistics database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='archive old games, vacuum and checkpoint once')
+    run.add_argument('--days', type=int, default=RETENTION_DAYS, help='keep games newer than this')
+    run.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    commands.add_parser('enable-vacuum', help='switch to incremental auto_vacuum (app must be stopped)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        print(run_maintenance(args.days, args.archive_dir).format())
+    else:
+        init_database()
+        enable_incremental_vacuum()
+        print('auto_vacuum set to INCREMENTAL')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""On-disk puzzle bank indexed by difficulty and puzzle id.
+
+Puzzles live in a SQLite file (CROSSWORD_PUZZLE_BANK, default puzzles.db),
+one compact JSON row each. Within a difficulty every puzzle has a dense
+sequence number, so picking a random puzzle is one indexed lookup and never
+reads the rest of the bank. Decoded puzzles are kept in a per-process LRU
+cache (CROSSWORD_PUZZLE_CACHE_SIZE entries) and shared between sessions, so
+callers must treat them as read-only.
+
+Usage:
+    python puzzle_bank.py seed                 # import CrosswordData.PUZZLES
+    python puzzle_bank.py import puzzles.jsonl # {"difficulty": ..., "grid_size": ..., "clues": [...]}
+    python puzzle_bank.py generate --count 100 # lay out new puzzles from the word index
+    python puzzle_bank.py stats
+"""
+import json
+import os
+import random
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database import connection, transaction
+
+PUZZLE_BANK_PATH = os.environ.get('CROSSWORD_PUZZLE_BANK', 'puzzles.db')
+PUZZLE_CACHE_SIZE = int(os.environ.get('CROSSWORD_PUZZLE_CACHE_SIZE', '256'))
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS puzzles (
+        id INTEGER PRIMARY KEY,
+        difficulty TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+    ''',
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_puzzles_difficulty_seq ON puzzles (difficulty, seq)',
+)
+
+
+class PuzzleBank:
+    """Random access to puzzles stored on disk, with an LRU of decoded puzzles"""
+
+    def __init__(self, path: str = PUZZLE_BANK_PATH, cache_size: int = PUZZLE_CACHE_SIZE,
+                 rng: Optional[random.Random] = None):
+        self.path = path
+        self.rng = rng or random.Random()
+        self._counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self.get = lru_cache(maxsize=cache_size)(self._read)
+        self._locate = lru_cache(maxsize=cache_size)(self._locate_id)
+
+    def ensure_schema(self):
+        with transaction(self.path) as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def count(self, difficulty: str) -> int:
+        """Number of puzzles for a difficulty, read once from the index"""
+        count = self._counts.get(difficulty)
+        if count is None:
+            with connection(self.path) as conn:
+                row = conn.execute('SELECT MAX(seq) FROM puzzles WHERE difficulty = ?', (difficulty,)).fetchone()
+            count = 0 if row[0] is None else row[0] + 1
+            with self._counts_lock:
+                self._counts[difficulty] = count
+        return count
+
+    def _read(self, difficulty: str, seq: int) -> Optional[Dict]:
+        with connection(self.path) as conn:
+            row = conn.execute(
+                'SELECT id, data FROM puzzles WHERE difficulty = ? AND seq = ?', (difficulty, seq)
+            ).fetchone()
+        if row is None:
+            return None
+        puzzle = json.loads(row[1])
+        puzzle['puzzle_id'] = row[0]
+        puzzle['grid_size'] = tuple(puzzle['grid_size'])
+        return puzzle
+
+    def random_puzzle(self, difficulty: str) -> Optional[Dict]:
+        """Pick a random puzzle for a difficulty, or None if it has none"""
+        count = self.count(difficulty)
+        if not count:
+            return None
+        return self.get(difficulty, self.rng.randrange(count))
+
+    def _locate_id(self, puzzle_id: int) -> Optional[Tuple[str, int]]:
+        with connection(self.path) as conn:
+            return conn.execute('SELECT difficulty, seq FROM puzzles WHERE id = ?', (puzzle_id,)).fetchone()
+
+    def get_by_id(self, puzzle_id: int) -> Optional[Dict]:
+        """Shared decoded puzzle for a row id; repeated lookups never touch the database"""
+        location = self._locate(puzzle_id)
+        return None if location is None else self.get(location[0], location[1])
+
+    def add_puzzles(self, puzzles: Iterable[Tuple[str, Dict]], batch_size: int = 10000) -> int:
+        """Append (difficulty, puzzle) pairs; returns how many were added"""
+        self.ensure_schema()
+        added = 0
+        with transaction(self.path) as conn:
+            next_seq = dict(conn.execute('SELECT difficulty, MAX(seq) + 1 FROM puzzles GROUP BY difficulty'))
+            batch: List[Tuple[str, int, str]] = []
+            for difficulty, puzzle in puzzles:
+                seq = next_seq.get(difficulty, 0)
+                next_seq[difficulty] = seq + 1
+                data = {'grid_size': list(puzzle['grid_size']), 'clues': puzzle['clues']}
+                batch.append((difficulty, seq, json.dumps(data, separators=(',', ':'))))
+                if len(batch) >= batch_size:
+                    conn.executemany('INSERT INTO puzzles (difficulty, seq, data) VALUES (?, ?, ?)', batch)
+                    added += len(batch)
+                    batch = []
+            conn.executemany('INSERT INTO puzzles (difficulty, seq, data) VALUES (?, ?, ?)', batch)
+            added += len(batch)
+        with self._counts_lock:
+            self._counts.clear()
+        return added
+
+    def refresh(self):
+        """Forget cached counts so puzzles added by other processes become visible"""
+        with self._counts_lock:
+            self._counts.clear()
+
+
+_bank: Optional[PuzzleBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> Optional[PuzzleBank]:
+    """Return the process-wide bank, or None when no bank file exists"""
+    global _bank
+    if _bank is None:
+        if not os.path.exists(PUZZLE_BANK_PATH):
+            return None
+        with _bank_lock:
+            if _bank is None:
+                _bank = PuzzleBank(PUZZLE_BANK_PATH)
+    return _bank
+
+
+def read_jsonl(path: str) -> Iterator[Tuple[str, Dict]]:
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                puzzle = json.loads(line)
+                yield puzzle.pop('difficulty'), puzzle
+
+
+def generate_puzzles(count: int, rng: random.Random) -> Iterator[Tuple[str, Dict]]:
+    """Up to `count` generated (difficulty, puzzle) pairs per difficulty"""
+    from crossword import CrosswordData
+    for difficulty in ('easy', 'medium', 'hard'):
+        for _ in range(count):
+            puzzle = CrosswordData.generate_puzzle(difficulty, rng)
+            if puzzle is not None:
+                yield difficulty, puzzle
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the on-disk puzzle bank')
+    parser.add_argument('--bank', default=PUZZLE_BANK_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('seed', help='import the built-in CrosswordData.PUZZLES')
+    import_parser = commands.add_parser('import', help='import puzzles from a JSON Lines file')
+    import_parser.add_argument('file')
+    generate_parser = commands.add_parser('generate', help='lay out new puzzles from the word index')
+    generate_parser.add_argument('--count', type=int, default=100, help='puzzles per difficulty')
+    generate_parser.add_argument('--index', help='word index file (default CROSSWORD_WORD_INDEX)')
+    generate_parser.add_argument('--seed', type=int)
+    commands.add_parser('stats', help='show puzzle counts per difficulty')
+    args = parser.parse_args(argv)
+
+    bank = PuzzleBank(args.bank)
+    bank.ensure_schema()
+    if args.command == 'seed':
+        from crossword import CrosswordData
+        added = bank.add_puzzles(CrosswordData.PUZZLES.items())
+        print(f'Added {added} puzzles to {args.bank}')
+    elif args.command == 'import':
+        added = bank.add_puzzles(read_jsonl(args.file))
+        print(f'Added {added} puzzles to {args.bank}')
+    elif args.command == 'generate':
+        from crossword import CrosswordData
+        if args.index:
+            CrosswordData.WORD_INDEX_PATH = args.index
+        if CrosswordData.word_index() is None:
+            parser.error(f'no word index at {CrosswordData.WORD_INDEX_PATH}; build one with word_index.py')
+        added = bank.add_puzzles(generate_puzzles(args.count, random.Random(args.seed)))
+        print(f'Added {added} puzzles to {args.bank}')
+    else:
+        for difficulty in ('easy', 'medium', 'hard'):
+            print(f'{difficulty:>6}: {bank.count(difficulty)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Replay logged games through the game engine and rebuild aggregates.
+
+A replay starts a GameEngine on the logged puzzle and submits the logged
+answers in order, with the AI's logged results in place of new rolls, so
+scores, feedback and the winner are worked out by today's game logic.
+Differences from what was logged (for instance answers judged under a
+different CROSSWORD_TOLERANT_ANSWERS setting) are reported.
+
+Usage:
+    python replay.py games [--limit 20] [--log-dir attempt_log]
+    python replay.py game GAME_KEY [--log-dir attempt_log]
+    python replay.py stats [--log-dir attempt_log]
+"""
+import argparse
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+
+from attempt_log import (AI_SKIPPED, AI_TIMEOUT, AI_CORRECT, ATTEMPT, END, LOG_DIR, START, Event,
+                         decode, iter_events, log_files, read_records, rebuild_aggregates)
+from crossword import AIPlayer
+from game_engine import GameEngine, GameState
+
+
+class ReplayAI(AIPlayer):
+    """An AI opponent that gives back logged results instead of rolling new ones"""
+
+    __slots__ = ('results',)
+
+    def __init__(self, difficulty: str):
+        super().__init__(difficulty)
+        self.results: Deque[Optional[bool]] = deque()
+
+    def attempt_answer(self, clue) -> Optional[bool]:
+        # A clue the logged AI never tried counts as a miss if today's rules let it try
+        return self.results.popleft() if self.results else False
+
+
+class Replay(NamedTuple):
+    engine: GameEngine
+    events: List[Event]
+    mismatches: List[str]
+
+
+def replay_game(game_key: int, paths: Optional[List[str]] = None) -> Replay:
+    """Replay one game from the log; raises KeyError if its START was not found"""
+    events = list(iter_events(paths if paths is not None else log_files(), game_key))
+    start = next((event for event in events if event.kind == START), None)
+    if start is None:
+        raise KeyError(f'game {game_key:#x} is not in the log')
+    engine = GameEngine()
+    engine.state = state = GameState(start.difficulty, start.puzzle_id)
+    state.game_start_time = start.timestamp
+    engine.ai_player = ai = ReplayAI(start.difficulty)
+    mismatches = []
+    for number, event in enumerate(events, 1):
+        if event.kind == ATTEMPT:
+            result = event.ai_result
+            if result != AI_SKIPPED:
+                ai.results.append(None if result == AI_TIMEOUT else result == AI_CORRECT)
+            score = state.player_score
+            engine.submit(event.clue_id, event.answer)
+            if (state.player_score > score) != event.player_correct:
+                mismatches.append(f'attempt {number}: player answer {event.answer!r} judged differently')
+        elif event.kind == END:
+            if (state.winner, (state.player_score, state.ai_score)) != (event.winner, event.scores):
+                mismatches.append(f'result: logged {event.winner} {event.scores}, replayed '
+                                  f'{state.winner} {(state.player_score, state.ai_score)}')
+    return Replay(engine, events, mismatches)
+
+
+def recent_games(paths: List[str], limit: int) -> List[Event]:
+    """START events of the last `limit` games, newest first"""
+    found: List[Event] = []
+    for path in reversed(paths):
+        records = read_records(path)
+        starts = records[records['kind'] == START][-(limit - len(found)):]
+        found.extend(reversed(list(decode(starts))))
+        if len(found) >= limit:
+            break
+    return found
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Replay games and rebuild totals from the attempt log')
+    commands = parser.add_subparsers(dest='command', required=True)
+    game = commands.add_parser('game', help='replay one game')
+    game.add_argument('game_key', type=lambda text: int(text, 0), help='game key, e.g. 0x1f2e...')
+    games = commands.add_parser('games', help='list the most recently started games')
+    games.add_argument('--limit', type=int, default=20)
+    commands.add_parser('stats', help='rebuild per-difficulty totals')
+    for command in commands.choices.values():
+        command.add_argument('--log-dir', default=LOG_DIR)
+    args = parser.parse_args(argv)
+
+    paths = log_files(args.log_dir)
+    if args.command == 'stats':
+        print(rebuild_aggregates(paths).format())
+        return
+    if args.command == 'games':
+        for start in recent_games(paths, args.limit):
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start.timestamp))
+            print(f'{start.game_key:#018x}  {started}  {start.difficulty:<6}  puzzle {start.puzzle_id}')
+        return
+    try:
+        replay = replay_game(args.game_key, paths)
+    except KeyError as error:
+        parser.exit(1, f'{error.args[0]}\n')
+    state = replay.engine.state
+    print(f'{state.difficulty} game on puzzle {state.puzzle_id}')
+    for event in replay.events:
+        if event.kind == ATTEMPT:
+            print(f'  clue {event.clue_id}: {event.answer!r}')
+    print(f'{state.winner or "Unfinished"}: player {state.player_score}, AI {state.ai_score}')
+    for mismatch in replay.mismatches:
+        print(f'  mismatch, {mismatch}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Blocking client for room_server.py, used by the Streamlit app.
+
+A RoomClient holds one TCP connection. A daemon thread reads the server's
+broadcasts and keeps the latest room state, so a Streamlit rerun only
+reads `client.state` and never waits on the network.
+"""
+import json
+import os
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+
+# host:port of a running room server; rooms are hidden in the app when unset
+ROOM_SERVER = os.environ.get('CROSSWORD_ROOM_SERVER', '')
+CONNECT_TIMEOUT = 5.0
+
+
+def server_address(spec: str = ROOM_SERVER) -> Optional[Tuple[str, int]]:
+    if not spec:
+        return None
+    host, _, port = spec.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class RoomClient:
+    """One player's connection to the room server"""
+
+    def __init__(self, address: Tuple[str, int], timeout: float = CONNECT_TIMEOUT):
+        self._sock = socket.create_connection(address, timeout=timeout)
+        self._sock.settimeout(None)
+        self._changed = threading.Condition()
+        self.state: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.name: Optional[str] = None
+        self.connected = True
+        self._thread = threading.Thread(target=self._read, name='room-client', daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        try:
+            for line in self._sock.makefile('rb'):
+                message = json.loads(line)
+                with self._changed:
+                    if message['type'] == 'state':
+                        self.state = message
+                    elif message['type'] == 'error':
+                        self.error = message['message']
+                    self._changed.notify_all()
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._changed:
+                self.connected = False
+                self._changed.notify_all()
+
+    def _send(self, message: Dict):
+        self._sock.sendall((json.dumps(message) + '\n').encode())
+
+    def join(self, room: str, name: str, difficulty: str = 'medium', seats: int = 2, ai: bool = False):
+        """Take a seat; the room is created with these settings if it does not exist yet"""
+        self.name, self.error = name, None
+        self._send({'op': 'join', 'room': room, 'name': name, 'difficulty': difficulty,
+                    'seats': seats, 'ai': ai})
+
+    def submit(self, answer: str, clue_id: Optional[int] = None):
+        self.error = None
+        self._send({'op': 'submit', 'clue_id': clue_id, 'answer': answer})
+
+    def wait(self, version: int = 0, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Block until a state newer than `version` or an error arrives; returns the latest state"""
+        with self._changed:
+            self._changed.wait_for(lambda: (self.state is not None and self.state['version'] > version)
+                                   or self.error is not None or not self.connected, timeout)
+            return self.state
+
+    def close(self):
+        try:
+            self._send({'op': 'leave'})
+        except OSError:
+            pass
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
@@ -0,0 +1,377 @@
+"""Asyncio room server for multiplayer games.
+
+A room is a game for `seats` human players, optionally with the AI as an
+extra opponent. The server owns the game: players only send answers, and
+the server judges them, keeps score and broadcasts the room's state to
+every player after each change. The rules are the single-player rules:
+MAX_ATTEMPTS rounds on the puzzle's clues in order, POINTS_PER_CLUE for
+every right answer, and the top score wins, with a shared top score being a
+Draw (game_engine.decide_winner). A round ends when every connected player
+has answered, or after ROUND_SECONDS, when missing answers count as wrong.
+
+Clients talk newline-delimited JSON over TCP; room_client.py is a blocking
+client for the Streamlit app.
+
+    -> {"op": "join", "room": "r1", "name": "ann", "difficulty": "easy", "seats": 2, "ai": false}
+    -> {"op": "submit", "clue_id": 1, "answer": "DOG"}
+    -> {"op": "leave"}
+    -> {"op": "stats"}
+    <- {"type": "state", "room": "r1", "status": "waiting" | "playing" | "finished", ...}
+    <- {"type": "error", "message": "..."}
+
+The room's difficulty, seats and AI come from the join that creates it. A
+room starts when its seats are filled and is dropped once its players are
+gone, or FINISHED_TTL seconds after it ends. A player who disconnects from
+a started game can join again under the same name to get their seat back.
+
+Usage: python room_server.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import time
+from typing import Dict, List, Optional
+
+from crossword import AIPlayer, CompiledPuzzle, CrosswordData
+from fuzzy import accepted_answers
+from game_engine import (DIFFICULTIES, FUZZY_DISTANCE, MAX_ANSWER_LENGTH, MAX_ATTEMPTS, POINTS_PER_CLUE,
+                         TOLERANT_ANSWERS, decide_winner, judge_answer)
+
+logger = logging.getLogger(__name__)
+
+HOST = os.environ.get('CROSSWORD_ROOM_HOST', '127.0.0.1')
+PORT = int(os.environ.get('CROSSWORD_ROOM_PORT', '8765'))
+ROUND_SECONDS = float(os.environ.get('CROSSWORD_ROUND_SECONDS', '60'))
+MAX_ROOMS = int(os.environ.get('CROSSWORD_MAX_ROOMS', '10000'))
+MAX_SEATS = 8
+FINISHED_TTL = 60.0
+MAX_LINE = 4096
+# A client that lets this much unread state pile up is disconnected
+MAX_WRITE_BUFFER = 256 * 1024
+AI_NAME = 'AI'
+
+_rng = random.Random()
+
+
+class Connection:
+    """One client socket and the seat it holds, if any"""
+
+    __slots__ = ('writer', 'room', 'name')
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.room: Optional['Room'] = None
+        self.name: Optional[str] = None
+
+    def send(self, data: bytes):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            logger.warning('Dropping %s in room %s: not reading its updates', self.name,
+                           self.room.name if self.room else None)
+            transport.abort()
+            return
+        self.writer.write(data)
+
+
+class Room:
+    """Authoritative state of one multiplayer game"""
+
+    def __init__(self, server: 'RoomServer', name: str, difficulty: str, seats: int, ai: bool):
+        self.server = server
+        self.name = name
+        self.difficulty = difficulty
+        self.seats = seats
+        self.ai = AIPlayer(difficulty, rng=_rng) if ai else None
+        self.players: Dict[str, Optional[Connection]] = {}  # None once disconnected
+        self.scores: Dict[str, int] = {}
+        self.puzzle: Optional[CompiledPuzzle] = None
+        self.status = 'waiting'
+        self.round = 0
+        self.answers: Dict[str, str] = {}
+        self.ai_solved = 0
+        self.last_round: Optional[Dict] = None
+        self.winner: Optional[str] = None
+        self.version = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def join(self, connection: Connection, name: str) -> Optional[str]:
+        """Seat a player; returns an error message instead when that is not possible"""
+        if name == AI_NAME or not name:
+            return 'choose another name'
+        if name in self.players and self.players[name] is None and self.status != 'closed':
+            # A player who dropped out takes their seat and score back
+            self.players[name] = connection
+            connection.room, connection.name = self, name
+            self.broadcast()
+            return None
+        if name in self.players:
+            return f'{name} is already in room {self.name}'
+        if self.status != 'waiting' or len(self.players) >= self.seats:
+            return f'room {self.name} is full'
+        self.players[name] = connection
+        connection.room, connection.name = self, name
+        if len(self.players) == self.seats:
+            self.status = 'starting'
+            asyncio.get_running_loop().create_task(self.start())
+        self.broadcast()
+        return None
+
+    def leave(self, name: str):
+        connection = self.players.get(name)
+        if connection is not None:
+            connection.room = connection.name = None
+        if self.status == 'waiting':
+            self.players.pop(name, None)
+        elif name in self.players:
+            self.players[name] = None
+        if not any(self.players.values()):
+            self.close()
+            return
+        if self.status == 'playing' and self._everyone_answered():
+            self.close_round()
+        else:
+            self.broadcast()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        # Bank puzzles may need a disk read, and answer indexes some CPU: keep both off the loop
+        try:
+            self.puzzle = await loop.run_in_executor(None, self._load_puzzle)
+        except Exception:
+            logger.exception('Could not load a %s puzzle for room %s', self.difficulty, self.name)
+            if self.status == 'starting':
+                self.send_error('could not load a puzzle; the room was closed')
+                self.close()
+            return
+        if self.status != 'starting':
+            return
+        self.scores = {name: 0 for name in self.players}
+        if self.ai is not None:
+            self.scores[AI_NAME] = 0
+        self.status = 'playing'
+        self._start_round()
+
+    def _load_puzzle(self) -> CompiledPuzzle:
+        puzzle_id = CrosswordData.puzzle_id(CrosswordData.get_puzzle(self.difficulty), self.difficulty)
+        puzzle = CrosswordData.get_compiled(puzzle_id)
+        if TOLERANT_ANSWERS:
+            for position in range(len(puzzle)):
+                puzzle.fuzzy_index(position, FUZZY_DISTANCE)
+        return puzzle
+
+    @property
+    def position(self) -> int:
+        return min(self.round, len(self.puzzle) - 1)
+
+    def _start_round(self):
+        self.answers = {}
+        self._timer = asyncio.get_running_loop().call_later(ROUND_SECONDS, self.close_round)
+        self.broadcast()
+
+    def submit(self, name: str, clue_id: Optional[int], answer: str) -> Optional[str]:
+        if self.status != 'playing':
+            return 'the game is not in progress'
+        clue = self.puzzle.clues[self.position]
+        if clue_id is not None and clue_id != clue['id']:
+            return f'clue {clue_id} is not the current clue'
+        if name in self.answers:
+            return 'you already answered this clue'
+        # Anything longer cannot be accepted, and judging it runs on the event loop
+        longest = max(map(len, accepted_answers(clue))) + (FUZZY_DISTANCE if TOLERANT_ANSWERS else 0)
+        self.answers[name] = answer[:longest]
+        if self._everyone_answered():
+            self.close_round(closed_by=name)
+        else:
+            self.broadcast()
+        return None
+
+    def _everyone_answered(self) -> bool:
+        return all(name in self.answers for name, connection in self.players.items() if connection is not None)
+
+    def close_round(self, closed_by: Optional[str] = None):
+        if self.status != 'playing':
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        position = self.position
+        clue = self.puzzle.clues[position]
+        results = {}
+        for name in self.players:
+            correct = judge_answer(self.puzzle, position, self.answers.get(name, '')) is not None
+            results[name] = correct
+            if correct:
+                self.scores[name] += POINTS_PER_CLUE
+        # As in a single-player game, the AI skips a clue it has already solved
+        if self.ai is not None and not self.ai_solved >> position & 1:
+            correct = self.ai.attempt_answer(clue)
+            results[AI_NAME] = correct
+            if correct:
+                self.scores[AI_NAME] += POINTS_PER_CLUE
+                self.ai_solved |= 1 << position
+        self.last_round = {'clue_id': clue['id'], 'answer': clue['answer'], 'results': results,
+                           'closed_by': closed_by}
+        self.round += 1
+        if self.round >= MAX_ATTEMPTS:
+            self.status = 'finished'
+            self.winner = decide_winner(self.scores)
+            self.server.finished += 1
+            self._timer = asyncio.get_running_loop().call_later(FINISHED_TTL, self.close)
+            self.broadcast()
+        else:
+            self._start_round()
+
+    def snapshot(self) -> Dict:
+        state = {
+            'type': 'state',
+            'room': self.name,
+            'version': self.version,
+            'sent': time.time(),
+            'status': self.status,
+            'difficulty': self.difficulty,
+            'seats': self.seats,
+            'players': [name for name, connection in self.players.items() if connection is not None],
+            'scores': self.scores,
+            'round': self.round,
+            'attempts_left': MAX_ATTEMPTS - self.round,
+            'last_round': self.last_round,
+            'winner': self.winner,
+        }
+        if self.status == 'playing':
+            clue = self.puzzle.clues[self.position]
+            state['clue'] = {'id': clue['id'], 'clue': clue['clue'], 'direction': clue['direction'],
+                             'length': len(clue['answer'])}
+            state['answered'] = list(self.answers)
+        return state
+
+    def broadcast(self):
+        self.version += 1
+        data = (json.dumps(self.snapshot()) + '\n').encode()
+        for connection in self.players.values():
+            if connection is not None:
+                connection.send(data)
+
+    def send_error(self, message: str):
+        data = (json.dumps({'type': 'error', 'message': message}) + '\n').encode()
+        for connection in self.players.values():
+            if connection is not None:
+                connection.send(data)
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self.status = 'closed'
+        for connection in self.players.values():
+            if connection is not None and connection.room is self:
+                connection.room = connection.name = None
+        self.server.rooms.pop(self.name, None)
+
+
+class RoomServer:
+    """Rooms by name and the connections playing in them"""
+
+    def __init__(self, max_rooms: int = MAX_ROOMS):
+        self.max_rooms = max_rooms
+        self.rooms: Dict[str, Room] = {}
+        self.connections = 0
+        self.finished = 0
+
+    async def serve(self, host: str = HOST, port: int = PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE, backlog=1024)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(writer)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # line over MAX_LINE or connection reset
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    error = self.dispatch(connection, message)
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    error = 'malformed message'
+                if error is not None:
+                    connection.send((json.dumps({'type': 'error', 'message': error}) + '\n').encode())
+        finally:
+            self.connections -= 1
+            if connection.room is not None:
+                connection.room.leave(connection.name)
+            writer.close()
+
+    def dispatch(self, connection: Connection, message: Dict) -> Optional[str]:
+        op = message['op']
+        if op == 'submit':
+            if connection.room is None:
+                return 'join a room first'
+            answer = message['answer']
+            if not isinstance(answer, str):
+                return 'malformed message'
+            return connection.room.submit(connection.name, message.get('clue_id'), answer[:MAX_ANSWER_LENGTH])
+        if op == 'join':
+            if connection.room is not None:
+                connection.room.leave(connection.name)
+            name = str(message['room'])
+            room = self.rooms.get(name)
+            if room is None:
+                if len(self.rooms) >= self.max_rooms:
+                    return 'the server is full'
+                difficulty = message.get('difficulty', 'medium')
+                if difficulty not in DIFFICULTIES:
+                    return f'unknown difficulty {difficulty}'
+                seats = int(message.get('seats', 2))
+                if not 1 <= seats <= MAX_SEATS:
+                    return f'a room has 1 to {MAX_SEATS} seats'
+                room = self.rooms[name] = Room(self, name, difficulty, seats, bool(message.get('ai')))
+            error = room.join(connection, str(message['name']))
+            if error is not None and not room.players:
+                room.close()
+            return error
+        if op == 'leave':
+            if connection.room is not None:
+                connection.room.leave(connection.name)
+            return None
+        if op == 'stats':
+            connection.send((json.dumps({'type': 'stats', **self.stats()}) + '\n').encode())
+            return None
+        return f'unknown op {op}'
+
+    def stats(self) -> Dict[str, int]:
+        playing = sum(1 for room in self.rooms.values() if room.status == 'playing')
+        return {'rooms': len(self.rooms), 'playing': playing, 'connections': self.connections,
+                'finished': self.finished}
+
+
+async def run(host: str, port: int):
+    server = await RoomServer().serve(host, port)
+    sockets = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    print(f'Room server listening on {sockets}', flush=True)
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    async with server:
+        await stop.wait()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Serve multiplayer crossword rooms')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
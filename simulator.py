@@ -0,0 +1,181 @@
+"""Vectorized Monte Carlo simulator for calibrating AIPlayer difficulty.
+
+Plays millions of 5-attempt games per difficulty with the same rules as
+GameEngine, drawing every AIPlayer.attempt_answer and player attempt from
+NumPy. Player accuracy is parametric: each simulated game draws a player
+skill from a Beta distribution with the given mean and concentration, and
+each attempt succeeds with that probability.
+
+Usage:
+    python simulator.py --games 1000000 --seed 7
+    python simulator.py --target-win-rate 0.5 --player-accuracy hard=0.6
+"""
+import argparse
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from crossword import AIPlayer, CrosswordData
+from game_engine import MAX_ATTEMPTS, POINTS_PER_CLUE
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Mean per-attempt accuracy of a typical human player, per difficulty
+PLAYER_ACCURACY = {
+    'easy': 0.85,
+    'medium': 0.7,
+    'hard': 0.55,
+}
+# Beta concentration (alpha + beta): higher means less spread between players
+PLAYER_CONCENTRATION = 8.0
+
+CHUNK_SIZE = 1_000_000
+
+
+class SimulationResult(NamedTuple):
+    difficulty: str
+    games: int
+    ai_accuracy: float
+    player_accuracy: float
+    player_wins: int
+    ai_wins: int
+    draws: int
+    player_score_hist: np.ndarray
+    ai_score_hist: np.ndarray
+
+    @property
+    def win_rate(self) -> float:
+        return self.player_wins / self.games
+
+    def format(self) -> str:
+        scores = np.arange(MAX_ATTEMPTS + 1) * POINTS_PER_CLUE
+        lines = [
+            f'{self.difficulty:>6}: ai_accuracy={self.ai_accuracy:.3f} '
+            f'player_accuracy={self.player_accuracy:.3f} games={self.games:,}',
+            f'        win {self.player_wins / self.games:6.2%}  '
+            f'loss {self.ai_wins / self.games:6.2%}  draw {self.draws / self.games:6.2%}',
+            '        score  ' + ' '.join(f'{s:>7}' for s in scores),
+            '        player ' + ' '.join(f'{c / self.games:7.2%}' for c in self.player_score_hist),
+            '        ai     ' + ' '.join(f'{c / self.games:7.2%}' for c in self.ai_score_hist),
+        ]
+        return '\n'.join(lines)
+
+
+def attempt_clue_indices(difficulty: str) -> np.ndarray:
+    """Clue index played on each attempt, matching GameEngine.current_clue_index"""
+    clue_count = len(CrosswordData.get_puzzle(difficulty)['clues'])
+    return np.minimum(np.arange(MAX_ATTEMPTS), clue_count - 1)
+
+
+def simulate_chunk(rng: np.random.Generator, games: int, ai_accuracy: float, player_accuracy: float,
+                   clue_indices: np.ndarray, concentration: float = PLAYER_CONCENTRATION):
+    """Return (player_correct, ai_correct) counts per game for one chunk"""
+    alpha = player_accuracy * concentration
+    beta = (1.0 - player_accuracy) * concentration
+    if 0.0 < player_accuracy < 1.0:
+        skill = rng.beta(alpha, beta, size=(games, 1))
+    else:
+        skill = np.full((games, 1), player_accuracy)
+    player_hits = rng.random((games, MAX_ATTEMPTS)) < skill
+    ai_rolls = rng.random((games, MAX_ATTEMPTS)) < ai_accuracy
+
+    # The AI only attempts a clue it has not already solved; with fewer clues
+    # than attempts the last clue repeats.
+    if len(np.unique(clue_indices)) == MAX_ATTEMPTS:
+        ai_hits = ai_rolls
+    else:
+        ai_hits = np.zeros_like(ai_rolls)
+        solved = np.zeros((games, int(clue_indices.max()) + 1), dtype=bool)
+        for attempt, clue in enumerate(clue_indices):
+            ai_hits[:, attempt] = ai_rolls[:, attempt] & ~solved[:, clue]
+            solved[:, clue] |= ai_hits[:, attempt]
+    return player_hits.sum(axis=1), ai_hits.sum(axis=1)
+
+
+def simulate(difficulty: str, games: int, seed: int, ai_accuracy: Optional[float] = None,
+             player_accuracy: Optional[float] = None, chunk_size: int = CHUNK_SIZE) -> SimulationResult:
+    """Simulate games for one difficulty in fixed-size chunks"""
+    if ai_accuracy is None:
+        ai_accuracy = AIPlayer.accuracy_rates[difficulty]
+    if player_accuracy is None:
+        player_accuracy = PLAYER_ACCURACY[difficulty]
+    clue_indices = attempt_clue_indices(difficulty)
+
+    # One independent stream per difficulty, one child stream per chunk, so
+    # results depend only on (seed, difficulty, games, chunk_size).
+    stream = np.random.SeedSequence([seed, DIFFICULTIES.index(difficulty)])
+    chunks = -(-games // chunk_size)
+    player_hist = np.zeros(MAX_ATTEMPTS + 1, dtype=np.int64)
+    ai_hist = np.zeros(MAX_ATTEMPTS + 1, dtype=np.int64)
+    player_wins = ai_wins = 0
+    for index, child in enumerate(stream.spawn(chunks)):
+        size = min(chunk_size, games - index * chunk_size)
+        player, ai = simulate_chunk(np.random.default_rng(child), size, ai_accuracy, player_accuracy, clue_indices)
+        player_hist += np.bincount(player, minlength=MAX_ATTEMPTS + 1)
+        ai_hist += np.bincount(ai, minlength=MAX_ATTEMPTS + 1)
+        player_wins += int(np.count_nonzero(player > ai))
+        ai_wins += int(np.count_nonzero(ai > player))
+
+    return SimulationResult(
+        difficulty, games, ai_accuracy, player_accuracy,
+        player_wins, ai_wins, games - player_wins - ai_wins, player_hist, ai_hist,
+    )
+
+
+def solve_ai_accuracy(difficulty: str, target_win_rate: float, games: int, seed: int,
+                      player_accuracy: Optional[float] = None, tolerance: float = 1e-3) -> SimulationResult:
+    """Bisect the AI accuracy whose simulated player win rate hits the target.
+
+    Every evaluation reuses the same seed (common random numbers), so the
+    win rate is monotone in the AI accuracy and bisection converges cleanly.
+    """
+    low, high = 0.0, 1.0
+    best = None
+    while high - low > tolerance:
+        mid = (low + high) / 2
+        best = simulate(difficulty, games, seed, ai_accuracy=mid, player_accuracy=player_accuracy)
+        if best.win_rate > target_win_rate:
+            low = mid
+        else:
+            high = mid
+    return best
+
+
+def parse_rates(pairs: List[str]) -> Dict[str, float]:
+    rates = {}
+    for pair in pairs:
+        difficulty, _, value = pair.partition('=')
+        if difficulty not in DIFFICULTIES or not value:
+            raise argparse.ArgumentTypeError(f'expected difficulty=rate, got {pair!r}')
+        rates[difficulty] = float(value)
+    return rates
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Monte Carlo calibration of AIPlayer accuracy rates')
+    parser.add_argument('--games', type=int, default=1_000_000, help='games per difficulty')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, action='append',
+                        help='limit to one or more difficulties')
+    parser.add_argument('--player-accuracy', nargs='*', default=[], metavar='DIFFICULTY=RATE',
+                        help='override the mean player accuracy')
+    parser.add_argument('--ai-accuracy', nargs='*', default=[], metavar='DIFFICULTY=RATE',
+                        help='override the AI accuracy instead of using AIPlayer')
+    parser.add_argument('--target-win-rate', type=float,
+                        help='solve for the AI accuracy giving this player win rate')
+    args = parser.parse_args(argv)
+
+    player_rates = parse_rates(args.player_accuracy)
+    ai_rates = parse_rates(args.ai_accuracy)
+    for difficulty in args.difficulty or DIFFICULTIES:
+        if args.target_win_rate is not None:
+            result = solve_ai_accuracy(difficulty, args.target_win_rate, args.games, args.seed,
+                                       player_accuracy=player_rates.get(difficulty))
+        else:
+            result = simulate(difficulty, args.games, args.seed, ai_accuracy=ai_rates.get(difficulty),
+                              player_accuracy=player_rates.get(difficulty))
+        print(result.format())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from database import connection, snapshot, transaction
+
+logger = logging.getLogger(__name__)
+
+# Player identity used when the caller does not supply one; also owns the
+# pre-migration shared statistics row.
+DEFAULT_PLAYER_ID = 'local'
+
+# Queue finished games for a background writer instead of writing inline
+WRITE_BEHIND = os.environ.get('CROSSWORD_WRITE_BEHIND', '0') == '1'
+
+# Cached summaries are refreshed after a save in this process, or after this
+# many seconds to pick up saves made by other processes.
+STATS_CACHE_TTL = float(os.environ.get('CROSSWORD_STATS_CACHE_TTL', '30'))
+STATS_CACHE_SIZE = 10000
+
+INSERT_GAME_STATS = '''
+    INSERT INTO game_stats (player_id, player_score, ai_score, difficulty, winner, game_date, duration_seconds)
+    VALUES (:player_id, :player_score, :ai_score, :difficulty, :winner, :game_date, :duration)
+'''
+
+# Totals and streaks are computed from the old row inside SQLite, so
+# concurrent saves for the same player cannot lose increments.
+UPSERT_PLAYER_STATS = '''
+    INSERT INTO player_stats (player_id, total_games, total_wins, total_score, win_streak, best_streak, last_updated)
+    VALUES (:player_id, 1, :won, :player_score, :won, :won, :game_date)
+    ON CONFLICT (player_id) DO UPDATE SET
+        total_games = total_games + 1,
+        total_wins = total_wins + excluded.total_wins,
+        total_score = total_score + excluded.total_score,
+        win_streak = CASE WHEN excluded.total_wins THEN win_streak + 1 ELSE 0 END,
+        best_streak = MAX(best_streak, CASE WHEN excluded.total_wins THEN win_streak + 1 ELSE 0 END),
+        last_updated = excluded.last_updated
+'''
+
+UPSERT_DAILY_STATS = '''
+    INSERT INTO daily_stats (day, difficulty, games, player_wins, ai_wins, draws,
+                             total_player_score, total_ai_score, total_duration, best_player_score)
+    VALUES (:day, :difficulty, 1, :won, :lost, :drawn, :player_score, :ai_score, :duration, :player_score)
+    ON CONFLICT (day, difficulty) DO UPDATE SET
+        games = games + 1,
+        player_wins = player_wins + excluded.player_wins,
+        ai_wins = ai_wins + excluded.ai_wins,
+        draws = draws + excluded.draws,
+        total_player_score = total_player_score + excluded.total_player_score,
+        total_ai_score = total_ai_score + excluded.total_ai_score,
+        total_duration = total_duration + excluded.total_duration,
+        best_player_score = MAX(best_player_score, excluded.best_player_score)
+'''
+
+
+class GameRecord(NamedTuple):
+    """One finished game, as written to game_stats"""
+    player_id: str
+    player_score: int
+    ai_score: int
+    difficulty: str
+    winner: str
+    game_date: datetime
+    duration: int
+
+    def params(self) -> dict:
+        params = self._asdict()
+        params['won'] = 1 if self.winner == 'Player' else 0
+        params['lost'] = 1 if self.winner == 'AI' else 0
+        params['drawn'] = 1 if self.winner == 'Draw' else 0
+        params['day'] = self.game_date.date().isoformat()
+        return params
+
+
+def write_games(conn: sqlite3.Connection, records: Iterable[GameRecord]):
+    """Insert games and fold them into player_stats and daily_stats; caller owns the transaction"""
+    params = [record.params() for record in records]
+    conn.executemany(INSERT_GAME_STATS, params)
+    # Rows are applied in order, so streaks come out as if saved one by one
+    conn.executemany(UPSERT_PLAYER_STATS, params)
+    conn.executemany(UPSERT_DAILY_STATS, params)
+
+
+def save_game_stats(player_score: int, ai_score: int, difficulty: str, winner: str, duration: int,
+                    player_id: str = DEFAULT_PLAYER_ID):
+    """Save a finished game and update the player's totals in one transaction"""
+    record = GameRecord(player_id, player_score, ai_score, difficulty, winner, datetime.now(), duration)
+    with transaction() as conn:
+        write_games(conn, [record])
+    invalidate_stats_cache()
+
+
+def record_game_stats(player_score: int, ai_score: int, difficulty: str, winner: str, duration: int,
+                      player_id: str = DEFAULT_PLAYER_ID):
+    """Persist a finished game, through the write-behind queue when enabled"""
+    if not WRITE_BEHIND:
+        save_game_stats(player_score, ai_score, difficulty, winner, duration, player_id=player_id)
+        return
+    from write_behind import get_writer
+    record = GameRecord(player_id, player_score, ai_score, difficulty, winner, datetime.now(), duration)
+    get_writer().enqueue(record)
+
+
+_legacy_unclaimed = True
+
+
+def has_legacy_player() -> bool:
+    """Whether the pre-migration shared statistics (DEFAULT_PLAYER_ID) are still unclaimed"""
+    global _legacy_unclaimed
+    if not _legacy_unclaimed:
+        return False
+    try:
+        with connection() as conn:
+            found = conn.execute('SELECT 1 FROM player_stats WHERE player_id = ?', (DEFAULT_PLAYER_ID,)).fetchone()
+    except sqlite3.Error:
+        logger.exception('Could not look up the legacy statistics')
+        return False
+    # Once gone, nothing in the app recreates the shared row
+    _legacy_unclaimed = found is not None
+    return _legacy_unclaimed
+
+
+def claim_legacy_player(player_id: str) -> bool:
+    """Hand the pre-migration shared statistics (DEFAULT_PLAYER_ID) to this player.
+
+    Only called when a player asks for them from the landing page; a
+    session opened with ?player=local plays as the shared player instead.
+    The rows are renamed in one transaction, so exactly one player gets
+    them; returns True for that player. Database errors are logged and
+    leave the rows where they were.
+    """
+    global _legacy_unclaimed
+    if not _legacy_unclaimed or player_id == DEFAULT_PLAYER_ID:
+        return False
+    try:
+        with transaction() as conn:
+            claimed = conn.execute('UPDATE player_stats SET player_id = ? WHERE player_id = ?',
+                                   (player_id, DEFAULT_PLAYER_ID)).rowcount
+            if claimed:
+                conn.execute('UPDATE game_stats SET player_id = ? WHERE player_id = ?',
+                             (player_id, DEFAULT_PLAYER_ID))
+                conn.execute('UPDATE player_difficulty_archive SET player_id = ? WHERE player_id = ?',
+                             (player_id, DEFAULT_PLAYER_ID))
+    except sqlite3.Error:
+        logger.exception('Could not hand the legacy statistics to %s', player_id)
+        return False
+    _legacy_unclaimed = False
+    if claimed:
+        invalidate_stats_cache()
+    return bool(claimed)
+
+
+class DifficultySummary:
+    """Running totals for one difficulty, folded in from new game rows"""
+
+    __slots__ = ('games', 'wins', 'total_duration')
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.total_duration = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games * 100 if self.games else 0.0
+
+    @property
+    def average_duration(self) -> float:
+        return self.total_duration / self.games if self.games else 0.0
+
+
+class PlayerSummary:
+    """Cached landing-page statistics for one player"""
+
+    __slots__ = ('row', 'by_difficulty', 'last_game_id', 'archived', 'version', 'expires')
+
+    def __init__(self):
+        self.row: Optional[Tuple] = None
+        self.by_difficulty: Dict[str, DifficultySummary] = {}
+        self.last_game_id = 0
+        self.archived: Tuple = ()  # player_difficulty_archive rows folded in
+        self.version = -1
+        self.expires = 0.0
+
+
+_summaries: 'OrderedDict[str, PlayerSummary]' = OrderedDict()
+_summaries_lock = threading.Lock()
+_stats_version = 0
+
+
+def invalidate_stats_cache():
+    """Mark every cached summary stale; the next read refreshes incrementally"""
+    global _stats_version
+    with _summaries_lock:
+        _stats_version += 1
+
+
+def stats_version() -> int:
+    """Bumped by every save in this process; caches compare it to detect staleness"""
+    return _stats_version
+
+
+def _refresh_summary(summary: PlayerSummary, player_id: str):
+    since = summary.last_game_id
+    first_load = summary.row is None
+    folded_archive = summary.archived
+    with snapshot() as conn:
+        row = conn.execute('''
+            SELECT id, total_games, total_wins, total_score, win_streak, best_streak, last_updated
+            FROM player_stats WHERE player_id = ?
+        ''', (player_id,)).fetchone()
+        # Games moved out of game_stats by maintenance.py: at most a row per difficulty
+        archived = tuple(conn.execute('''
+            SELECT difficulty, games, wins, total_duration, 0
+            FROM player_difficulty_archive WHERE player_id = ? ORDER BY difficulty
+        ''', (player_id,)).fetchall())
+        # Only games newer than the last refresh are read, unless games were
+        # archived since: some already folded in are gone, so start over.
+        rebuild = archived != folded_archive
+        new_games = conn.execute('''
+            SELECT difficulty, COUNT(*), SUM(winner = 'Player'), SUM(duration_seconds), MAX(id)
+            FROM game_stats WHERE player_id = ? AND id > ?
+            GROUP BY difficulty
+        ''', (player_id, 0 if rebuild else since)).fetchall()
+    with _summaries_lock:
+        if (summary.last_game_id != since or summary.archived is not folded_archive
+                or (first_load and summary.row is not None)):
+            return  # another thread already folded these rows in
+        summary.row = row
+        if rebuild:
+            summary.by_difficulty = {}
+            summary.archived = archived
+        else:
+            archived = ()
+        for difficulty, games, wins, duration, last_id in archived + tuple(new_games):
+            totals = summary.by_difficulty.get(difficulty)
+            if totals is None:
+                totals = summary.by_difficulty[difficulty] = DifficultySummary()
+            totals.games += games
+            totals.wins += wins or 0
+            totals.total_duration += duration or 0
+            summary.last_game_id = max(summary.last_game_id, last_id)
+
+
+def get_player_summary(player_id: str = DEFAULT_PLAYER_ID) -> PlayerSummary:
+    """Return the player's cached summary, refreshing it if a game was saved since"""
+    now = time.monotonic()
+    with _summaries_lock:
+        version = _stats_version
+        summary = _summaries.get(player_id)
+        if summary is not None:
+            _summaries.move_to_end(player_id)
+            if summary.version == version and now < summary.expires:
+                return summary
+        else:
+            summary = _summaries[player_id] = PlayerSummary()
+            if len(_summaries) > STATS_CACHE_SIZE:
+                _summaries.popitem(last=False)
+    # Refresh outside the lock; the version read above makes a save that
+    # lands meanwhile trigger another refresh on the next read.
+    _refresh_summary(summary, player_id)
+    summary.version = version
+    summary.expires = now + STATS_CACHE_TTL
+    return summary
+
+
+def get_player_stats(player_id: str = DEFAULT_PLAYER_ID) -> Optional[Tuple]:
+    """Load a player's stats row as (id, total_games, total_wins, total_score, win_streak, best_streak, last_updated)"""
+    return get_player_summary(player_id).row
@@ -0,0 +1,61 @@
+"""Retention of attempt_log.py files shared by several writer processes."""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from attempt_log import AttemptLog, log_files
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Writes one file, then holds it open until its stdin closes
+WRITER = textwrap.dedent('''
+    import sys
+    from attempt_log import AttemptLog
+    log = AttemptLog(sys.argv[1])
+    log.start(1, 'easy', 'easy')
+    log.flush()
+    print(log._handle.name, flush=True)
+    sys.stdin.read()
+    log.close()
+''')
+
+
+@pytest.fixture
+def other_writer(tmp_path):
+    process = subprocess.Popen([sys.executable, '-c', WRITER, str(tmp_path)], cwd=ROOT,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    path = process.stdout.readline().strip()
+    yield process, path
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+def rotate(log: AttemptLog, times: int):
+    for game in range(times):
+        log.start(game + 1, 'easy', 'easy')
+        log.end(game + 1, 'Player', 1, 0)
+
+
+def test_prune_keeps_files_of_running_writers(tmp_path, other_writer):
+    process, theirs = other_writer
+    log = AttemptLog(str(tmp_path), max_bytes=1, max_files=1)
+    rotate(log, 4)
+    ours = log._handle.name
+    assert log_files(str(tmp_path)) == sorted([theirs, ours])
+
+    process.stdin.close()
+    process.wait(timeout=10)
+    rotate(log, 1)
+    assert log_files(str(tmp_path)) == [log._handle.name]
+    log.close()
+
+
+def test_prune_removes_closed_files_past_retention(tmp_path, other_writer):
+    _, theirs = other_writer
+    log = AttemptLog(str(tmp_path), max_bytes=1, retention_days=0)
+    rotate(log, 3)
+    assert log_files(str(tmp_path)) == sorted([theirs, log._handle.name])
+    log.close()
@@ -0,0 +1,147 @@
+"""Durability contract of write_behind.py (see its module docstring)."""
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+from datetime import datetime
+
+import pytest
+
+import database
+import write_behind
+from stats import GameRecord
+from write_behind import MAX_RETRIES, WriteBehindQueue
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def record(score: int = 5) -> GameRecord:
+    return GameRecord('tester', score, 0, 'easy', 'Player', datetime.now(), 30)
+
+
+def saved_games(path: str) -> int:
+    with database.connection(path) as conn:
+        return conn.execute('SELECT COUNT(*) FROM game_stats').fetchone()[0]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    database.init_database(path)
+    yield path
+    database.get_pool(path).close()
+
+
+class GatedQueue(WriteBehindQueue):
+    """A writer that takes nothing off the queue until `gate` is set"""
+
+    def __init__(self, *args, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _next_batch(self):
+        self.gate.wait()
+        return super()._next_batch()
+
+
+def test_flush_and_close_drain_the_queue(db_path):
+    writer = WriteBehindQueue(db_path, flush_interval=0.01)
+    for score in range(20):
+        writer.enqueue(record(score))
+    assert writer.flush(timeout=10)
+    assert saved_games(db_path) == 20
+
+    for score in range(7):
+        writer.enqueue(record(score))
+    writer.close()
+    assert writer.pending() == 0
+    assert saved_games(db_path) == 27
+    assert writer.written == 27 and writer.dropped == 0
+
+
+def test_full_queue_writes_synchronously(db_path):
+    writer = GatedQueue(db_path, max_queue=2, flush_interval=0.01)
+    for score in range(3):
+        writer.enqueue(record(score))
+    # Two records wait behind the gate; the third was written on this thread
+    assert writer.overflowed == 1
+    assert saved_games(db_path) == 1
+
+    writer.gate.set()
+    assert writer.flush(timeout=10)
+    assert saved_games(db_path) == 3
+    writer.close()
+
+
+def test_failing_batch_is_dropped_after_retries(db_path, monkeypatch):
+    attempts = []
+
+    def fail(conn, batch):
+        attempts.append(len(batch))
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(write_behind, 'write_games', fail)
+    writer = GatedQueue(db_path, flush_interval=0.01)
+    writer.enqueue(record())
+    writer.enqueue(record())
+    writer.gate.set()
+    assert writer.flush(timeout=10)
+    assert attempts == [2] * MAX_RETRIES
+    assert writer.dropped == 2 and writer.written == 0
+    assert saved_games(db_path) == 0
+
+    # The writer keeps going after a dropped batch
+    monkeypatch.undo()
+    writer.enqueue(record())
+    assert writer.flush(timeout=10)
+    assert saved_games(db_path) == 1
+    writer.close()
+
+
+CRASHING_WRITER = textwrap.dedent('''
+    import sys, threading
+    from datetime import datetime
+    import database, write_behind
+    from stats import GameRecord
+
+    path = sys.argv[1]
+    database.init_database(path)
+    writer = write_behind.WriteBehindQueue(path, flush_interval=0.01)
+    for score in range(5):
+        writer.enqueue(GameRecord('tester', score, 0, 'easy', 'Player', datetime.now(), 30))
+    assert writer.flush(timeout=10)
+
+    # From here on the writer never reaches a commit
+    write_behind.transaction = lambda *args: threading.Event().wait()
+    for score in range(5):
+        writer.enqueue(GameRecord('tester', score, 0, 'easy', 'Player', datetime.now(), 30))
+    print('queued', flush=True)
+    threading.Event().wait()
+''')
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='needs SIGKILL')
+def test_hard_kill_loses_only_uncommitted_records(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (ROOT, os.environ.get('PYTHONPATH')))))
+    child = subprocess.Popen([sys.executable, '-c', CRASHING_WRITER, path], stdout=subprocess.PIPE,
+                             env=env, text=True)
+    try:
+        assert child.stdout.readline().strip() == 'queued'
+        os.kill(child.pid, signal.SIGKILL)
+        assert child.wait(timeout=10) == -signal.SIGKILL
+    finally:
+        if child.poll() is None:
+            child.kill()
+        child.stdout.close()
+
+    database.init_database(path)
+    try:
+        assert saved_games(path) == 5
+        with database.connection(path) as conn:
+            assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    finally:
+        database.get_pool(path).close()
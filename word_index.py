@@ -0,0 +1,220 @@
+"""Pattern-queryable word index for building crosswords.
+
+Words are grouped by length. Within a group they are sorted, stored as a
+fixed-width byte matrix, and every (position, letter) pair has a bitset of
+the words carrying that letter there. A query such as '?A?I?' ANDs the
+bitsets of its fixed letters, so its cost depends on the group size / 64,
+not on how many words are tested one by one.
+
+The index is saved as one file of 64-byte aligned sections and opened with
+mmap, so a process can query it without parsing or copying it. Optional
+clues (WORD<TAB>clue lines) are stored next to the words so the index can
+feed CrosswordData.generate_puzzle().
+
+Usage:
+    python word_index.py build words.txt words.idx
+    python word_index.py query words.idx '?A?I?'
+"""
+import argparse
+import json
+import mmap
+import random
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from layout import normalize_answer
+
+MAGIC = b'CWIDX\x00\x01\x00'
+ALIGN = 64
+WILDCARDS = '?._'
+
+
+class LengthGroup:
+    """Words of one length with their per-position letter bitsets"""
+
+    __slots__ = ('length', 'count', 'words', 'bits', 'clue_offsets', 'clues')
+
+    def __init__(self, length: int, words: np.ndarray, bits: np.ndarray,
+                 clue_offsets: np.ndarray, clues: bytes):
+        self.length = length
+        self.count = len(words)
+        self.words = words                # (count,) of dtype S<length>
+        self.bits = bits                  # (length, 26, blocks) uint64
+        self.clue_offsets = clue_offsets  # (count + 1,) uint32 into clues
+        self.clues = clues
+
+    @classmethod
+    def build(cls, length: int, entries: Sequence[Tuple[str, str]]) -> 'LengthGroup':
+        words = np.array([w.encode('ascii') for w, _ in entries], dtype=f'S{length}')
+        letters = words.view(np.uint8).reshape(len(words), length) - ord('A')
+        onehot = letters[:, :, None] == np.arange(26, dtype=np.uint8)
+        packed = np.packbits(onehot.transpose(1, 2, 0), axis=-1, bitorder='little')
+        blocks = -(-len(words) // 64)
+        padded = np.zeros((length, 26, blocks * 8), dtype=np.uint8)
+        padded[:, :, :packed.shape[-1]] = packed
+        clue_bytes = [clue.encode('utf-8') for _, clue in entries]
+        offsets = np.zeros(len(words) + 1, dtype=np.uint32)
+        np.cumsum([len(c) for c in clue_bytes], out=offsets[1:])
+        return cls(length, words, padded.view(np.uint64), offsets, b''.join(clue_bytes))
+
+    def match_indices(self, pattern: str) -> np.ndarray:
+        acc = None
+        for position, letter in enumerate(pattern):
+            if letter in WILDCARDS:
+                continue
+            code = ord(letter) - ord('A')
+            if not 0 <= code < 26:
+                return np.empty(0, dtype=np.intp)
+            row = self.bits[position, code]
+            if acc is None:
+                acc = row.copy()
+            else:
+                np.bitwise_and(acc, row, out=acc)
+        if acc is None:
+            return np.arange(self.count)
+        return np.flatnonzero(np.unpackbits(acc.view(np.uint8), bitorder='little')[:self.count])
+
+    def clue(self, index: int) -> str:
+        start, end = int(self.clue_offsets[index]), int(self.clue_offsets[index + 1])
+        return bytes(self.clues[start:end]).decode('utf-8')
+
+
+class WordIndex:
+    """Per-length, per-position bitset index over a word list"""
+
+    def __init__(self, groups: Dict[int, LengthGroup], mapped: Optional[mmap.mmap] = None):
+        self.groups = groups
+        self._mapped = mapped
+
+    def __len__(self) -> int:
+        return sum(group.count for group in self.groups.values())
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str]]) -> 'WordIndex':
+        """Build from (word, clue) pairs; words are normalized to A-Z and deduplicated"""
+        by_length: Dict[int, Dict[str, str]] = {}
+        for word, clue in entries:
+            word = normalize_answer(word)
+            if word:
+                by_length.setdefault(len(word), {}).setdefault(word, clue)
+        return cls({
+            length: LengthGroup.build(length, sorted(words.items()))
+            for length, words in sorted(by_length.items())
+        })
+
+    def match(self, pattern: str, limit: Optional[int] = None) -> List[str]:
+        """Words matching a pattern where ?, . or _ stand for any letter"""
+        group = self.groups.get(len(pattern))
+        if group is None:
+            return []
+        indices = group.match_indices(pattern.upper())
+        if limit is not None:
+            indices = indices[:limit]
+        return [w.decode('ascii') for w in group.words[indices].tolist()]
+
+    def count(self, pattern: str) -> int:
+        """Number of matches, for sizing a slot's domain without decoding words"""
+        group = self.groups.get(len(pattern))
+        return 0 if group is None else len(group.match_indices(pattern.upper()))
+
+    def clue_for(self, word: str) -> Optional[str]:
+        word = normalize_answer(word)
+        group = self.groups.get(len(word))
+        if group is None:
+            return None
+        position = int(np.searchsorted(group.words, word.encode('ascii')))
+        if position < group.count and group.words[position] == word.encode('ascii'):
+            return group.clue(position)
+        return None
+
+    def sample(self, length: int, k: int, rng: random.Random) -> List[Tuple[str, str]]:
+        """k random (word, clue) pairs of a given length"""
+        group = self.groups.get(length)
+        if group is None:
+            return []
+        picks = rng.sample(range(group.count), min(k, group.count))
+        return [(group.words[i].decode('ascii'), group.clue(i)) for i in picks]
+
+    def save(self, path: str):
+        """Write sections 64-byte aligned, followed by a JSON table of their offsets"""
+        header: Dict[str, Dict[str, int]] = {}
+        with open(path, 'wb') as handle:
+            handle.write(MAGIC)
+            handle.write(struct.pack('<QQ', 0, 0))
+            for length, group in self.groups.items():
+                entry = {'count': group.count, 'blocks': group.bits.shape[-1]}
+                for name, data in (('words', group.words.tobytes()), ('bits', group.bits.tobytes()),
+                                   ('clue_offsets', group.clue_offsets.tobytes()), ('clues', bytes(group.clues))):
+                    handle.write(b'\x00' * (_align(handle.tell()) - handle.tell()))
+                    entry[name] = handle.tell()
+                    entry[name + '_size'] = len(data)
+                    handle.write(data)
+                header[str(length)] = entry
+            header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+            header_offset = handle.tell()
+            handle.write(header_bytes)
+            handle.seek(len(MAGIC))
+            handle.write(struct.pack('<QQ', header_offset, len(header_bytes)))
+
+    @classmethod
+    def open(cls, path: str) -> 'WordIndex':
+        """Memory-map a saved index; nothing is copied until queried"""
+        with open(path, 'rb') as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            raise ValueError(f'{path} is not a word index file')
+        header_offset, header_size = struct.unpack_from('<QQ', mapped, len(MAGIC))
+        header = json.loads(mapped[header_offset:header_offset + header_size])
+        groups = {}
+        for key, entry in header.items():
+            length, count = int(key), entry['count']
+            words = np.frombuffer(mapped, dtype=f'S{length}', count=count, offset=entry['words'])
+            bits = np.frombuffer(mapped, dtype=np.uint64, count=length * 26 * entry['blocks'],
+                                 offset=entry['bits']).reshape(length, 26, entry['blocks'])
+            offsets = np.frombuffer(mapped, dtype=np.uint32, count=count + 1, offset=entry['clue_offsets'])
+            clues = memoryview(mapped)[entry['clues']:entry['clues'] + entry['clues_size']]
+            groups[length] = LengthGroup(length, words, bits, offsets, clues)
+        return cls(groups, mapped)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def read_word_list(path: str) -> Iterable[Tuple[str, str]]:
+    """Yield (word, clue) from WORD or WORD<TAB>clue lines"""
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            word, _, clue = line.rstrip('\n').partition('\t')
+            if word.strip():
+                yield word.strip(), clue.strip()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Build and query the crossword word index')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='index a word list')
+    build.add_argument('words')
+    build.add_argument('output')
+    query = commands.add_parser('query', help='list words matching a pattern such as ?A?I?')
+    query.add_argument('index')
+    query.add_argument('pattern')
+    query.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        index = WordIndex.build(read_word_list(args.words))
+        index.save(args.output)
+        print(f'Indexed {len(index)} words into {args.output}')
+    else:
+        index = WordIndex.open(args.index)
+        print(f'{index.count(args.pattern)} matches')
+        for word in index.match(args.pattern, limit=args.limit):
+            print(word)
+
+
+if __name__ == '__main__':
+    main()
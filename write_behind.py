@@ -0,0 +1,134 @@
+"""Write-behind persistence for finished games.
+
+Enabled with CROSSWORD_WRITE_BEHIND=1. Finished games are put on a bounded
+in-process queue and a daemon thread writes them in batches, one transaction
+per batch, so the winner screen never waits on disk I/O.
+
+Durability contract:
+- A record is durable once its batch commits, normally within
+  FLUSH_INTERVAL seconds of being enqueued.
+- On a clean shutdown (interpreter exit, close()) the queue is drained.
+- On a hard crash (SIGKILL, power loss, segfault) anything still queued or in
+  an uncommitted batch is lost: at most MAX_QUEUE + BATCH_SIZE games.
+- A batch that keeps failing is retried MAX_RETRIES times, then logged and
+  dropped so one bad batch cannot wedge the writer.
+- When the queue is full, enqueue() writes the record synchronously on the
+  caller's thread instead of dropping it or growing memory. Such a record
+  may land before older queued ones, which only affects streak ordering.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from database import transaction
+from stats import GameRecord, invalidate_stats_cache, write_games
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUE = int(os.environ.get('CROSSWORD_WRITE_BEHIND_MAX_QUEUE', '10000'))
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.25
+MAX_RETRIES = 3
+
+
+class WriteBehindQueue:
+    """Bounded queue of GameRecords drained by a background writer thread"""
+
+    def __init__(self, db_path: Optional[str] = None, max_queue: int = MAX_QUEUE,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: 'queue.Queue[GameRecord]' = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.overflowed = 0
+        self._thread = threading.Thread(target=self._run, name='stats-write-behind', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, record: GameRecord):
+        """Queue a record; falls back to a synchronous write when full or closed"""
+        if not self._stop.is_set():
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+        self.overflowed += 1
+        self._write([record])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything enqueued so far is committed or dropped"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting records, drain the queue and stop the writer"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _next_batch(self) -> List[GameRecord]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+            elif self._stop.is_set():
+                return
+
+    def _write(self, batch: List[GameRecord]):
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                with transaction(self.db_path) as conn:
+                    write_games(conn, batch)
+                invalidate_stats_cache()
+                self.written += len(batch)
+                return
+            except Exception:
+                if attempt == MAX_RETRIES:
+                    self.dropped += len(batch)
+                    logger.exception('Dropping %d game records after %d failed writes', len(batch), attempt)
+                    return
+                time.sleep(0.05 * 2 ** attempt)
+
+
+_writer: Optional[WriteBehindQueue] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> WriteBehindQueue:
+    """Return the process-wide writer, starting it on first use"""
+    global _writer
+    if _writer is None or not _writer._thread.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer._thread.is_alive():
+                _writer = WriteBehindQueue()
+                atexit.register(_writer.close)
+    return _writer